@@ -6,15 +6,26 @@ __all__ = [
     "delete",
     "set",
     "get",
+    "first",
+    "exists",
+    "count",
     "values",
     "search",
+    "search_many",
+    "columns",
     "merge",
+    "merge_many",
+    "compile",
     "exceptions",
     "options",
+    "pattern",
     "segments",
     "types",
     "version",
     "MergeType",
+    "Layered",
+    "Cached",
+    "Pattern",
     "PathSegment",
     "Filter",
     "Glob",
@@ -23,11 +34,17 @@ __all__ = [
     "Creator",
 ]
 
-from collections.abc import MutableMapping, MutableSequence
+from array import array
+from collections.abc import Mapping, MutableMapping, MutableSequence
+from functools import wraps
+from itertools import islice
 from typing import Union, List, Any, Callable, Optional
 
-from dpath import segments, options
-from dpath.exceptions import InvalidKeyName, PathNotFound
+from dpath import segments, options, cache, instrument, _engine
+from dpath.cache import Cached
+from dpath.exceptions import PathNotFound
+from dpath.layered import Layered
+from dpath.pattern import Pattern, compile
 from dpath.types import MergeType, PathSegment, Creator, Filter, Glob, Path, Hints
 
 _DEFAULT_SENTINEL = object()
@@ -51,6 +68,46 @@ def _split_path(path: Path, separator: Optional[str] = "/") -> Union[List[PathSe
     return split_segments
 
 
+def _invalidates(function):
+    """
+    Decorate a function that changes its first argument, so the results
+    cached for it are discarded once the function returns.
+    """
+    @wraps(function)
+    def wrapper(obj, *args, **kwargs):
+        try:
+            return function(obj, *args, **kwargs)
+        finally:
+            cache.invalidate(obj)
+
+    return wrapper
+
+
+def _compile(glob: Glob, separator) -> Pattern:
+    """
+    Compile glob for one of the functions below, counting its matching
+    towards the operation being recorded, if any (see dpath.instrument).
+    """
+    pattern = compile(glob, separator)
+    if instrument.enabled:
+        pattern = instrument.counting(pattern)
+    return pattern
+
+
+def _counted_creator(creator: Creator) -> Creator:
+    stats = instrument.current()
+    if stats is None:
+        return creator
+
+    def counted(current, segments, i, hints=()):
+        stats.created += 1
+        return creator(current, segments, i, hints)
+
+    return counted
+
+
+@instrument.operation("new")
+@_invalidates
 def new(obj: MutableMapping, path: Path, value, separator="/", creator: Creator | None = None) -> MutableMapping:
     """
     Set the element at the terminus of path to value, and create
@@ -66,95 +123,145 @@ def new(obj: MutableMapping, path: Path, value, separator="/", creator: Creator
     the path (see the help for dpath.path.set)
     """
     split_segments = _split_path(path, separator)
+    if instrument.enabled:
+        creator = _counted_creator(creator or segments._default_creator)
     if creator:
         return segments.set(obj, split_segments, value, creator=creator)
     return segments.set(obj, split_segments, value)
 
 
-def delete(obj: MutableMapping, glob: Glob, separator="/", afilter: Filter | None = None) -> int:
+@instrument.operation("delete")
+@_invalidates
+def delete(
+        obj: MutableMapping,
+        glob: Glob,
+        separator="/",
+        afilter: Filter | None = None,
+        compact=False
+) -> int:
     """
     Given a obj, delete all elements that match the glob.
 
+    Elements of sequences can only be removed without shifting the remaining
+    elements when they are at the end; others are replaced with None. If
+    compact is True they are all removed instead. Each affected sequence is
+    rebuilt once, after every match has been found.
+
     Returns the number of deleted objects. Raises PathNotFound if no paths are
     found to delete.
     """
-    globlist = _split_path(glob, separator)
+    # The afilter alone decides what is deleted, so with one every leaf is a
+    # candidate.
+    pattern = _compile('**' if afilter else glob, separator)
+    deleted = 0
 
-    def f(obj, pair, counter):
-        (path_segments, value) = pair
+    if instrument.enabled:
+        afilter = instrument.counting_filter(afilter)
 
-        # Skip segments if they no longer exist in obj.
-        if not segments.has(obj, path_segments):
-            return
+    # Sequences to compact, by id, with the indices to remove from each.
+    compacted = {}
+
+    matches = segments._select(obj, pattern, snapshot=True)
+    removed = None
+
+    while True:
+        try:
+            location, parent, value = matches.send(removed)
+        except StopIteration:
+            break
+
+        removed = None
+
+        # Members of sets and the like have no key to delete them by.
+        if not hasattr(parent, "__getitem__"):
+            continue
 
-        matched = segments.match(path_segments, globlist)
-        selected = afilter and segments.leaf(value) and afilter(value)
+        if afilter and not (segments.leaf(value) and afilter(value)):
+            continue
 
-        if (matched and not afilter) or selected:
-            key = path_segments[-1]
-            parent = segments.get(obj, path_segments[:-1])
+        key = location.key
 
-            # Deletion behavior depends on parent type
-            if isinstance(parent, MutableMapping):
+        # Deletion behavior depends on parent type
+        if isinstance(parent, MutableMapping):
+            del parent[key]
+
+        elif compact and isinstance(parent, MutableSequence):
+            compacted.setdefault(id(parent), (parent, []))[1].append(key)
+
+        else:
+            # Handle sequence types
+            # TODO: Consider cases where type isn't a simple list (e.g. set)
+
+            if len(parent) - 1 == key:
+                # Removing the last element of a sequence. It can be
+                # truly removed without affecting the ordering of
+                # remaining items.
                 del parent[key]
 
             else:
-                # Handle sequence types
-                # TODO: Consider cases where type isn't a simple list (e.g. set)
-
-                if len(parent) - 1 == key:
-                    # Removing the last element of a sequence. It can be
-                    # truly removed without affecting the ordering of
-                    # remaining items.
-                    #
-                    # Note: In order to achieve proper behavior we are
-                    # relying on the reverse iteration of
-                    # non-dictionaries from segments.kvs().
-                    # Otherwise we'd be unable to delete all the tails
-                    # of a list and end up with None values when we
-                    # don't need them.
-                    del parent[key]
-
-                else:
-                    # This key can't be removed completely because it
-                    # would affect the order of items that remain in our
-                    # result.
-                    parent[key] = None
-
-            counter[0] += 1
-
-    [deleted] = segments.foldm(obj, f, [0])
+                # This key can't be removed completely because it
+                # would affect the order of items that remain in our
+                # result.
+                parent[key] = None
+
+        # Whatever was below the deleted value is gone with it.
+        removed = True
+        deleted += 1
+
+    for parent, indices in compacted.values():
+        indices = frozenset(indices)
+        kept = [value for i, value in enumerate(parent) if i not in indices]
+
+        parent.clear()
+        parent.extend(kept)
+
     if not deleted:
         raise PathNotFound(f"Could not find {glob} to delete it")
 
     return deleted
 
 
+@instrument.operation("set")
+@_invalidates
 def set(obj: MutableMapping, glob: Glob, value, separator="/", afilter: Filter | None = None) -> int:
     """
     Given a path glob, set all existing elements in the document
     to the given value. Returns the number of elements changed.
     """
-    globlist = _split_path(glob, separator)
+    pattern = _compile(glob, separator)
+    changed = 0
 
-    def f(obj, pair, counter):
-        (path_segments, found) = pair
+    if instrument.enabled:
+        afilter = instrument.counting_filter(afilter)
 
-        # Skip segments if they no longer exist in obj.
-        if not segments.has(obj, path_segments):
-            return
+    matches = segments._select(obj, pattern)
+    replaced = None
+
+    while True:
+        try:
+            location, parent, found = matches.send(replaced)
+        except StopIteration:
+            break
+
+        replaced = None
+
+        # Members of sets and the like have no key to set them by.
+        if not hasattr(parent, "__getitem__"):
+            continue
+
+        if afilter and not (segments.leaf(found) and afilter(found)):
+            continue
 
-        matched = segments.match(path_segments, globlist)
-        selected = afilter and segments.leaf(found) and afilter(found)
+        parent[location.key] = value
 
-        if (matched and not afilter) or (matched and selected):
-            segments.set(obj, path_segments, value, creator=None)
-            counter[0] += 1
+        # Whatever was below the replaced value is no longer in obj.
+        replaced = True
+        changed += 1
 
-    [changed] = segments.foldm(obj, f, [0])
     return changed
 
 
+@instrument.operation("get")
 def get(
         obj: MutableMapping,
         glob: Glob,
@@ -170,20 +277,19 @@ def get(
     If more than one leaf matches the glob, ValueError is raised. If the glob is
     not found and a default is not provided, KeyError is raised.
     """
-    if isinstance(glob, str) and glob == "/" or len(glob) == 0:
+    source = glob.source if isinstance(glob, Pattern) else glob
+    if isinstance(source, str) and source == "/" or len(source) == 0:
         return obj
 
-    globlist = _split_path(glob, separator)
+    pattern = _compile(glob, separator)
 
-    def f(_, pair, results):
-        (path_segments, found) = pair
-
-        if segments.match(path_segments, globlist):
-            results.append(found)
-        if len(results) > 1:
-            return False
-
-    results = segments.fold(obj, f, [])
+    if pattern.literal:
+        results = segments.lookup(obj, pattern)
+        if instrument.enabled:
+            instrument.looked_up(pattern)
+    else:
+        # Two results are enough to know the glob is ambiguous.
+        results = [found for _, found in islice(segments.select(obj, pattern), 2)]
 
     if len(results) == 0:
         if default is not _DEFAULT_SENTINEL:
@@ -196,17 +302,38 @@ def get(
     return results[0]
 
 
-def values(obj: MutableMapping, glob: Glob, separator="/", afilter: Filter | None = None, dirs=True):
+@instrument.operation("values")
+def values(
+        obj: MutableMapping,
+        glob: Glob,
+        separator="/",
+        afilter: Filter | None = None,
+        dirs=True,
+        limit: Optional[int] = None
+):
     """
     Given an object and a path glob, return an array of all values which match
     the glob. The arguments to this function are identical to those of search().
     """
-    yielded = True
+    _check_limit("values", limit)
+    pattern = _compile(glob, separator)
+
+    # The same matches as search(yielded=True), without joining their paths.
+    matches = _engine.matches(obj, pattern, _engine.make_keeper(afilter, dirs))
 
-    return [v for p, v in search(obj, glob, yielded, separator, afilter, dirs)]
+    return [found for _, found in islice(matches, limit)]
 
 
-def search(obj: MutableMapping, glob: Glob, yielded=False, separator="/", afilter: Filter | None = None, dirs=True):
+@instrument.operation("search")
+def search(
+        obj: MutableMapping,
+        glob: Glob,
+        yielded=False,
+        separator="/",
+        afilter: Filter | None = None,
+        dirs=True,
+        limit: Optional[int] = None
+):
     """
     Given a path glob, return a dictionary containing all keys
     that matched the given glob.
@@ -214,40 +341,283 @@ def search(obj: MutableMapping, glob: Glob, yielded=False, separator="/", afilte
     If 'yielded' is true, then a dictionary will not be returned.
     Instead, tuples will be yielded in the form of (path, value) for
     every element in the document that matched the glob.
+
+    If limit is given, the search stops after that many matches, without
+    visiting the rest of the document.
     """
+    _check_limit("search", limit)
 
-    split_glob = _split_path(glob, separator)
+    pattern = _compile(glob, separator)
+    keeper = _engine.make_keeper(afilter, dirs)
 
-    def keeper(path, found):
-        """
-        Generalized test for use in both yielded and folded cases.
-        Returns True if we want this result. Otherwise, returns False.
-        """
-        if not dirs and not segments.leaf(found):
-            return False
+    if yielded:
+        def yielder():
+            for location, found in islice(_engine.matches(obj, pattern, keeper), limit):
+                yield separator.join(map(segments.int_str, location.segments())), found
+
+        return yielder()
+    else:
+        return _engine.complete(_engine.search(obj, pattern, keeper, limit=limit))
 
-        matched = segments.match(path, split_glob)
-        selected = afilter and afilter(found)
 
-        return (matched and not afilter) or (matched and selected)
+@instrument.operation("first")
+def first(
+        obj: MutableMapping,
+        glob: Glob,
+        separator="/",
+        afilter: Filter | None = None,
+        dirs=True,
+        default: Any = _DEFAULT_SENTINEL
+):
+    """
+    Return the first value that matches the glob, in the same order as
+    values(), without visiting the rest of the document.
+
+    If nothing matches and a default is provided, the default is returned.
+    Otherwise KeyError is raised.
+    """
+    pattern = _compile(glob, separator)
+
+    for _, found in _engine.matches(obj, pattern, _engine.make_keeper(afilter, dirs)):
+        return found
+
+    if default is not _DEFAULT_SENTINEL:
+        return default
+
+    raise KeyError(glob)
+
+
+@instrument.operation("exists")
+def exists(obj: MutableMapping, glob: Glob, separator="/", afilter: Filter | None = None, dirs=True) -> bool:
+    """
+    Return True if anything in the object matches the glob. The search stops
+    at the first match.
+    """
+    pattern = _compile(glob, separator)
+
+    for _ in _engine.matches(obj, pattern, _engine.make_keeper(afilter, dirs)):
+        return True
+
+    return False
+
+
+@instrument.operation("count")
+def count(
+        obj: MutableMapping,
+        glob: Glob,
+        separator="/",
+        afilter: Filter | None = None,
+        dirs=True,
+        limit: Optional[int] = None
+) -> int:
+    """
+    Return the number of values that match the glob, i.e. the length of
+    values(), without collecting them. If limit is given, counting stops
+    once it is reached.
+    """
+    _check_limit("count", limit)
+    pattern = _compile(glob, separator)
+
+    return sum(1 for _ in islice(_engine.matches(obj, pattern, _engine.make_keeper(afilter, dirs)), limit))
+
+
+def _check_limit(operation: str, limit: Optional[int]):
+    if limit is not None and limit < 0:
+        raise ValueError(f"dpath.{operation}() limit must not be negative: {limit}")
+
+
+@instrument.operation("search_many")
+def search_many(
+        obj: MutableMapping,
+        globs: Mapping[Any, Glob],
+        yielded=False,
+        separator="/",
+        afilter: Filter | None = None,
+        dirs=True
+):
+    """
+    Search for several globs at once. globs maps names to globs, and the
+    result maps each name to what search() would return for its glob:
+
+    >>> dpath.search_many(obj, {'hosts': 'servers/*/host', 'ports': 'servers/*/port'})
+
+    obj is traversed once for all of the globs, rather than once per glob.
+
+    If 'yielded' is true, (name, path, value) tuples are yielded instead, for
+    every element that matched each glob.
+    """
+    names = tuple(globs)
+    patterns = [_compile(globs[name], separator) for name in names]
+    keeper = _engine.make_keeper(afilter, dirs)
 
     if yielded:
         def yielder():
-            for path, found in segments.walk(obj):
-                if keeper(path, found):
-                    yield separator.join(map(segments.int_str, path)), found
+            for i, location, _, found in segments._select_many(obj, patterns):
+                if keeper(found):
+                    yield names[i], separator.join(map(segments.int_str, location.segments())), found
 
         return yielder()
     else:
-        def f(obj, pair, result):
-            (path, found) = pair
+        builders = [_engine.result_builder(obj) for _ in names]
 
-            if keeper(path, found):
-                segments.set(result, path, found, hints=segments.types(obj, path))
+        for i, location, _, found in segments._select_many(obj, patterns):
+            if keeper(found):
+                builders[i][1](location, found)
 
-        return segments.fold(obj, f, {})
+        return {name: result for name, (result, _) in zip(names, builders)}
 
 
+@instrument.operation("columns")
+def columns(
+        obj: MutableMapping,
+        globs: Mapping[Any, Glob],
+        dtype="d",
+        separator="/",
+        fill=None,
+        mask=False,
+        as_numpy=False
+):
+    """
+    Extract numeric columns from a collection of records. obj holds one
+    record per row, in a list or a dictionary, and globs maps names to globs
+    that each match at most one leaf per record:
+
+    >>> dpath.columns(records, {'latency': '*/metrics/latency', 'size': '*/size'})
+    {'latency': array('d', [0.25, 0.5, nan]), 'size': array('d', [1.0, 2.0, 3.0])}
+
+    The row of a match is the position of the record it is in, in obj. The
+    values go straight into an array.array of type dtype for each glob (an
+    array typecode, such as 'd', 'f', 'q' or 'l'), with obj traversed once
+    for all of the globs. If as_numpy is True, numpy arrays sharing the
+    memory of those are returned instead.
+
+    Rows with no match, or whose match is None (null in JSON), are set to
+    fill, which defaults to NaN for floating point columns; ValueError is
+    raised for missing values in other columns without a fill. If mask is
+    True, a (columns, masks) pair is returned, where each mask has a 1 (True
+    with numpy) for every missing value, and fill defaults to 0.
+
+    ValueError is raised if a glob matches more than once in a record,
+    TypeError if a match is not a number and OverflowError if it does not
+    fit in the column.
+    """
+    names = tuple(globs)
+    patterns = [_compile(globs[name], separator) for name in names]
+
+    rows = None
+
+    # The number of rows, and the length that negative indices in the globs
+    # count back from if obj is a sequence.
+    size = len(obj)
+    length = segments._size(obj)
+
+    if fill is None and (mask or dtype in ("f", "d")):
+        fill = 0 if mask else float("nan")
+
+    if fill is None:
+        buffers = [array(dtype, bytes(array(dtype).itemsize * size)) for _ in names]
+    else:
+        buffers = [array(dtype, [fill]) * size for _ in names]
+
+    # 1 for each row that has no value (yet).
+    missing = [bytearray(b"\x01") * size for _ in names]
+
+    def store(i, row, key, found, segments_of):
+        # A null is how a record says it has no value.
+        if found is None:
+            return
+
+        if not missing[i][row]:
+            path = separator.join(map(segments.int_str, segments_of()))
+            raise ValueError(f"{globs[names[i]]} matches more than once in record {key!r}, at {path}")
+
+        try:
+            buffers[i][row] = found
+        except (TypeError, OverflowError) as e:
+            path = separator.join(map(segments.int_str, segments_of()))
+            raise type(e)(f"Cannot store {found!r}, found at {path}, in a column of type {dtype!r}") from None
+
+        missing[i][row] = 0
+
+    # Globs that are literal after the segment that picks the record, such
+    # as '*/metrics/latency', are looked up directly in each record rather
+    # than matched against every key in it. Through plain dictionaries, keys
+    # that are neither empty nor numbers can only match themselves, so they
+    # are simply fetched.
+    direct = []
+    walked = []
+
+    for i, pattern in enumerate(patterns):
+        if pattern.prefix and not pattern.recursive and all(s.literal for s in pattern.prefix[1:]):
+            tail = Pattern(pattern.segments[1:])
+            keys = tuple(s.glob for s in tail.prefix)
+
+            if not all(k and isinstance(k, str) and s.index is None for k, s in zip(keys, tail.prefix)):
+                keys = None
+
+            direct.append((i, pattern.prefix[0], tail, keys))
+        else:
+            walked.append(i)
+
+    if direct:
+        for row, (key, record) in enumerate(segments._walkable(obj)):
+            for i, first, tail, keys in direct:
+                if not first.match(key, length):
+                    continue
+
+                segments._check_key(key, ())
+                found = record
+
+                if keys is not None:
+                    for k in keys:
+                        if found.__class__ is not dict:
+                            break
+
+                        found = found.get(k, _DEFAULT_SENTINEL)
+                        if found is _DEFAULT_SENTINEL:
+                            break
+                    else:
+                        store(i, row, key, found, lambda: (key,) + tail.segments)
+                        continue
+
+                    if found is _DEFAULT_SENTINEL:
+                        continue
+
+                for found in segments.lookup(record, tail) if tail else (record,):
+                    store(i, row, key, found, lambda: (key,) + tail.segments)
+
+    if walked:
+        if hasattr(obj, "items"):
+            rows = {key: row for row, key in enumerate(obj)}
+
+        for j, location, _, found in segments._select_many(obj, [patterns[i] for i in walked]):
+            top = location
+            while top.parent.__class__ is segments.Location:
+                top = top.parent
+
+            row = top.key if rows is None else rows[top.key]
+            store(walked[j], row, top.key, found, location.segments)
+
+    if fill is None:
+        for name, absent in zip(names, missing):
+            if any(absent):
+                raise ValueError(f"{globs[name]} has no match in row {absent.index(1)}, and no fill was given")
+
+    if as_numpy:
+        import numpy
+
+        buffers = [numpy.frombuffer(b, dtype=dtype) for b in buffers]
+        missing = [numpy.frombuffer(m, dtype=bool) for m in missing]
+
+    result = dict(zip(names, buffers))
+
+    if mask:
+        return result, dict(zip(names, missing))
+
+    return result
+
+
+@instrument.operation("merge")
 def merge(
         dst: MutableMapping,
         src: MutableMapping,
@@ -285,80 +655,28 @@ def merge(
 
     flags is an OR'ed combination of MergeType enum members.
     """
-    filtered_src = search(src, '**', afilter=afilter, separator='/')
-
-    def are_both_mutable(o1, o2):
-        mapP = isinstance(o1, MutableMapping) and isinstance(o2, MutableMapping)
-        seqP = isinstance(o1, MutableSequence) and isinstance(o2, MutableSequence)
-
-        if mapP or seqP:
-            return True
-
-        return False
-
-    def merger(dst, src, _segments=()):
-        for key, found in segments.make_walkable(src):
-            # Our current path in the source.
-            current_path = _segments + (key,)
-
-            if len(key) == 0 and not options.ALLOW_EMPTY_STRING_KEYS:
-                raise InvalidKeyName("Empty string keys not allowed without "
-                                     "dpath.options.ALLOW_EMPTY_STRING_KEYS=True: "
-                                     f"{current_path}")
-
-            # Validate src and dst types match.
-            if flags & MergeType.TYPESAFE:
-                if segments.has(dst, current_path):
-                    target = segments.get(dst, current_path)
-                    tt = type(target)
-                    ft = type(found)
-                    if tt != ft:
-                        path = separator.join(current_path)
-                        raise TypeError(f"Cannot merge objects of type {tt} and {ft} at {path}")
-
-            # Path not present in destination, create it.
-            if not segments.has(dst, current_path):
-                segments.set(dst, current_path, found)
-                continue
-
-            # Retrieve the value in the destination.
-            target = segments.get(dst, current_path)
-
-            # If the types don't match, replace it.
-            if type(found) is not type(target) and not are_both_mutable(found, target):
-                segments.set(dst, current_path, found)
-                continue
-
-            # If target is a leaf, the replace it.
-            if segments.leaf(target):
-                segments.set(dst, current_path, found)
-                continue
-
-            # At this point we know:
-            #
-            # * The target exists.
-            # * The types match.
-            # * The target isn't a leaf.
-            #
-            # Pretend we have a sequence and account for the flags.
-            try:
-                if flags & MergeType.ADDITIVE:
-                    target += found
-                    continue
+    return merge_many(dst, (src,), separator, afilter, flags)
 
-                if flags & MergeType.REPLACE:
-                    try:
-                        target[""]
-                    except TypeError:
-                        segments.set(dst, current_path, found)
-                        continue
-                    except Exception:
-                        raise
-            except Exception:
-                # We have a dictionary like thing and we need to attempt to
-                # recursively merge it.
-                merger(dst, found, current_path)
 
-    merger(dst, filtered_src)
+@instrument.operation("merge_many")
+@_invalidates
+def merge_many(
+        dst: MutableMapping,
+        sources,
+        separator="/",
+        afilter: Filter | None = None,
+        flags=MergeType.ADDITIVE
+):
+    """
+    Merge each of the sources into destination, in order. The result is the
+    same as calling merge() with each source in turn, but each container in
+    destination is visited once for all of the sources that reach it, rather
+    than once per source.
+
+    As with merge(), the sources are REFERENCED from destination, not copied.
+    If sources share objects with each other or with destination, they may
+    be modified in a different order than by successive merge() calls.
 
-    return dst
+    flags is an OR'ed combination of MergeType enum members.
+    """
+    return _engine.complete(_engine.merge(dst, sources, separator, afilter, flags))
@@ -0,0 +1,301 @@
+"""
+The traversals behind the functions in dpath, shared with the modules that
+run them differently (dpath.aio, dpath.stream).
+"""
+# Needed for pre-3.10 versions
+from __future__ import annotations
+
+from collections.abc import Mapping, MutableMapping, MutableSequence
+from typing import Optional
+
+from dpath import segments, instrument
+from dpath.pattern import Pattern, compile
+from dpath.types import Filter, MergeType
+
+
+def make_keeper(afilter: Filter | None, dirs: bool):
+    if instrument.enabled:
+        afilter = instrument.counting_filter(afilter)
+
+    def keeper(found):
+        """
+        Generalized test for matches in both yielded and dictionary cases.
+        Returns True if we want this result. Otherwise, returns False.
+        """
+        if not dirs and not segments.leaf(found):
+            return False
+
+        return not afilter or afilter(found)
+
+    return keeper
+
+
+def matches(obj, pattern: Pattern, keeper):
+    """
+    Yield the (Location, value) pairs for the matches that keeper(found)
+    accepts, in the order dpath.search() yields them.
+    """
+    for location, _, found in segments._select(obj, pattern):
+        if keeper(found):
+            yield location, found
+
+
+def search(obj, pattern: Pattern, keeper, pause=None, limit: Optional[int] = None):
+    """
+    Generator that builds the dictionary returned by dpath.search() for the
+    matches that keeper(found) accepts, and returns it. If limit is given,
+    it stops after that many matches.
+
+    It yields None after every pause keys visited (see segments._select),
+    so the search can be interleaved with other work. Use complete() to run
+    it all at once.
+    """
+    result, add = result_builder(obj)
+
+    if limit is not None and limit <= 0:
+        return result
+
+    selected = segments._select(obj, pattern, pause=pause)
+    kept = None
+
+    while True:
+        try:
+            match = selected.send(kept)
+        except StopIteration:
+            break
+
+        if match is None:
+            kept = None
+            yield
+            continue
+
+        location, parent, found = match
+
+        kept = keeper(found)
+        if kept:
+            # A match brings everything below it along, so there is no need
+            # to look beneath it.
+            add(location, found)
+
+            if limit is not None:
+                limit -= 1
+                if not limit:
+                    break
+
+    return result
+
+
+def complete(generator):
+    """
+    Run a generator such as search() to the end, and return its result.
+    """
+    while True:
+        try:
+            next(generator)
+        except StopIteration as e:
+            return e.value
+
+
+def result_builder(obj):
+    """
+    Return a (result, add) pair for building the dictionary returned by
+    dpath.search(). Calling add(location, value) adds a match to result, in
+    place of dpath.segments.set(result, path, value, hints=...), unless it
+    is below a match that has already been added.
+
+    Containers are created once for each location that leads to a match and
+    are reused for every match below it.
+    """
+    result = {}
+    stats = instrument.current() if instrument.enabled else None
+
+    # The result container built for each location that leads to a match,
+    # along with the value it stands for. Matches that have been added map to
+    # None, since they bring everything below them along.
+    built = {(): (result, obj)}
+
+    def place(container, key, value):
+        if isinstance(container, MutableSequence):
+            segments.extend(container, key)
+        container[key] = value
+
+    def add(location, found):
+        # Find the closest ancestor that already has a container, then
+        # create the containers below it, each the same type as the value
+        # it stands for where possible.
+        missing = []
+        ancestor = location.parent
+
+        while ancestor not in built:
+            missing.append(ancestor)
+            ancestor = ancestor.parent
+
+        if built[ancestor] is None:
+            for ancestor in missing:
+                built[ancestor] = None
+            return
+
+        container, source = built[ancestor]
+
+        for ancestor in reversed(missing):
+            source = source[ancestor.key]
+            child = type(source)()
+
+            # Read-only containers (such as Layered views) are built as
+            # plain dictionaries and lists instead.
+            if not isinstance(child, (MutableMapping, MutableSequence)):
+                child = {} if isinstance(source, Mapping) else []
+
+            place(container, ancestor.key, child)
+            built[ancestor] = container, source = child, source
+
+        if stats is not None:
+            stats.created += len(missing)
+
+        place(container, location.key, found)
+        built[location] = None
+
+    return result, add
+
+
+def merge(dst: MutableMapping, sources, separator, afilter: Filter | None, flags, pause=None):
+    """
+    Generator that merges each of the sources into dst for merge_many(), and
+    returns dst.
+
+    It yields None after every pause keys it visits, like search().
+    """
+    countdown = pause or 0
+    stats = instrument.current() if instrument.enabled else None
+
+    if afilter is None:
+        sources = tuple(sources)
+    else:
+        everything = compile('**')
+        keeper = make_keeper(afilter, True)
+        filtered = []
+
+        for src in sources:
+            filtered.append((yield from search(src, everything, keeper, pause)))
+
+        sources = tuple(filtered)
+
+    def are_both_mutable(o1, o2):
+        mapP = isinstance(o1, MutableMapping) and isinstance(o2, MutableMapping)
+        seqP = isinstance(o1, MutableSequence) and isinstance(o2, MutableSequence)
+
+        if mapP or seqP:
+            return True
+
+        return False
+
+    # Testing flag members is slow, so it is only done once.
+    typesafe = bool(flags & MergeType.TYPESAFE)
+    additive = bool(flags & MergeType.ADDITIVE)
+    replace = bool(flags & MergeType.REPLACE)
+
+    def merger(dst, sources, _segments=()):
+        nonlocal countdown
+
+        # dst is the destination container at _segments, so every lookup
+        # below is a single step from it rather than a walk from the root.
+        #
+        # The values for each key are collected from all of the sources, in
+        # order, so the key is only looked up in dst once. Keys are handled
+        # in the order they are first seen, which is the order in which
+        # merging the sources one at a time would add them to dst.
+        founds = {}
+
+        for src in sources:
+            for key, found in segments._walkable(src):
+                if countdown:
+                    countdown -= 1
+                    if not countdown:
+                        countdown = pause
+                        yield
+
+                segments._check_key(key, _segments)
+                founds.setdefault(key, []).append(found)
+
+        if stats is not None:
+            stats.visited += sum(map(len, founds.values()))
+
+        # With more than one source, containers that have to be merged
+        # recursively are collected by id, along with every source to merge
+        # into them, and merged once all keys at this level are done.
+        deferred = {}
+
+        for key, found_all in founds.items():
+            step = (key,)
+
+            present = segments.has(dst, step)
+            if present:
+                # Retrieve the value in the destination.
+                target = segments.get(dst, step)
+
+            for found in found_all:
+                # Path not present in destination, create it.
+                if not present:
+                    segments.set(dst, step, found)
+                    present, target = True, found
+                    continue
+
+                # Validate src and dst types match.
+                if typesafe:
+                    tt = type(target)
+                    ft = type(found)
+                    if tt != ft:
+                        # Our current path in the source.
+                        path = separator.join(_segments + step)
+                        raise TypeError(f"Cannot merge objects of type {tt} and {ft} at {path}")
+
+                # If the types don't match, replace it.
+                if type(found) is not type(target) and not are_both_mutable(found, target):
+                    segments.set(dst, step, found)
+                    target = found
+                    continue
+
+                # If target is a leaf, the replace it.
+                if segments.leaf(target):
+                    segments.set(dst, step, found)
+                    target = found
+                    continue
+
+                # At this point we know:
+                #
+                # * The target exists.
+                # * The types match.
+                # * The target isn't a leaf.
+                #
+                # Pretend we have a sequence and account for the flags.
+                try:
+                    if additive:
+                        # Immutable targets are not replaced in dst by +=,
+                        # so target must not be rebound either.
+                        merged = target
+                        merged += found
+                        continue
+
+                    if replace:
+                        try:
+                            target[""]
+                        except TypeError:
+                            segments.set(dst, step, found)
+                            target = found
+                            continue
+                        except Exception:
+                            raise
+                except Exception:
+                    # We have a dictionary like thing and we need to attempt
+                    # to recursively merge it.
+                    if len(sources) == 1:
+                        yield from merger(target, (found,), _segments + step)
+                    else:
+                        deferred.setdefault(id(target), (target, step, []))[2].append(found)
+
+        for target, step, found in deferred.values():
+            yield from merger(target, found, _segments + step)
+
+    yield from merger(dst, sources)
+
+    return dst
@@ -0,0 +1,109 @@
+"""
+Versions of the dpath functions that can be used from asyncio code without
+blocking the event loop.
+
+Traversals are plain Python and hold the CPU until they are done, so a
+search over a large document stalls every other task on the loop. These
+functions give control back to the event loop after every so many keys
+they visit (every, 1000 by default), so other tasks keep running while a
+large document is searched or merged:
+
+>>> async def handler(document):
+...     return await dpath.aio.values(document, 'users/*/email')
+
+They return the same results as their counterparts in dpath. The document
+must not be modified by other tasks while a traversal is suspended.
+"""
+# Needed for pre-3.10 versions
+from __future__ import annotations
+
+import asyncio
+from typing import AsyncIterator, Tuple, Any, Iterable
+
+from dpath import _engine, cache, segments
+from dpath.pattern import compile
+from dpath.types import Filter, Glob, MergeType
+
+__all__ = ["search", "values", "merge", "merge_many", "EVERY"]
+
+# The number of keys visited between two yields to the event loop.
+EVERY = 1000
+
+
+async def _drive(generator):
+    """
+    Run a generator such as _engine.search() to the end, yielding to the event
+    loop each time it pauses, and return its result.
+    """
+    while True:
+        try:
+            next(generator)
+        except StopIteration as e:
+            return e.value
+
+        await asyncio.sleep(0)
+
+
+def search(obj, glob: Glob, yielded=False, separator="/", afilter: Filter | None = None, dirs=True, every=EVERY):
+    """
+    Same as dpath.search(), but yields to the event loop after every every
+    keys visited.
+
+    If yielded is false, this returns an awaitable for the dictionary of
+    matches. Otherwise it returns an asynchronous iterator of (path, value)
+    tuples:
+
+    >>> async for path, value in dpath.aio.search(document, '**/id', yielded=True):
+    ...     print(path, value)
+    """
+    pattern = compile(glob, separator)
+    keeper = _engine.make_keeper(afilter, dirs)
+
+    if yielded:
+        async def yielder() -> AsyncIterator[Tuple[str, Any]]:
+            for match in segments._select(obj, pattern, pause=every):
+                if match is None:
+                    await asyncio.sleep(0)
+                    continue
+
+                location, parent, found = match
+                if keeper(found):
+                    yield separator.join(map(segments.int_str, location.segments())), found
+
+        return yielder()
+    else:
+        return _drive(_engine.search(obj, pattern, keeper, every))
+
+
+async def values(obj, glob: Glob, separator="/", afilter: Filter | None = None, dirs=True, every=EVERY) -> list:
+    """
+    Same as dpath.values(), but yields to the event loop after every every
+    keys visited.
+    """
+    return [v async for p, v in search(obj, glob, True, separator, afilter, dirs, every)]
+
+
+async def merge(dst, src, separator="/", afilter: Filter | None = None, flags=MergeType.ADDITIVE, every=EVERY):
+    """
+    Same as dpath.merge(), but yields to the event loop after every every
+    keys visited. Returns dst.
+    """
+    return await merge_many(dst, (src,), separator, afilter, flags, every)
+
+
+async def merge_many(
+        dst,
+        sources: Iterable,
+        separator="/",
+        afilter: Filter | None = None,
+        flags=MergeType.ADDITIVE,
+        every=EVERY
+):
+    """
+    Same as dpath.merge_many(), but yields to the event loop after every
+    every keys visited. Returns dst.
+    """
+    try:
+        return await _drive(_engine.merge(dst, sources, separator, afilter, flags, every))
+    finally:
+        cache.invalidate(dst)
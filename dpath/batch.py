@@ -0,0 +1,218 @@
+"""
+Apply the same dpath operations to many documents, using a pool of threads
+or processes.
+
+Operations are built once, with their globs compiled, and then run against
+each document in turn:
+
+>>> from dpath import batch
+>>> operations = [batch.get('user/id'), batch.set('meta/seen', True), batch.delete('secret')]
+>>> for result in batch.run(operations, documents, processes=True):
+...     print(result.results, result.error)
+"""
+# Needed for pre-3.10 versions
+from __future__ import annotations
+
+import os
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
+from types import GeneratorType
+from typing import Any, Iterable, List, NamedTuple, Optional, Sequence
+
+import dpath
+from dpath.pattern import compile
+from dpath.types import Filter, Glob
+
+__all__ = ["Operation", "Result", "run", "get", "values", "search", "set", "delete"]
+
+# The number of documents sent to a worker at a time.
+CHUNK_SIZE = 256
+
+
+class Operation(object):
+    """
+    A call to one of the dpath functions, with its glob compiled, that can be
+    applied to any number of documents.
+
+    Operations are picklable (as long as their arguments are), so they can be
+    sent to worker processes.
+    """
+
+    __slots__ = ("function", "pattern", "args", "kwargs")
+
+    def __init__(self, function: str, glob: Glob, *args, separator="/", **kwargs):
+        self.function = function
+        self.pattern = compile(glob, separator)
+        self.args = args
+        self.kwargs = kwargs
+
+    def __call__(self, obj):
+        result = getattr(dpath, self.function)(obj, self.pattern, *self.args, **self.kwargs)
+
+        # Generators can't be returned from worker processes.
+        if isinstance(result, GeneratorType):
+            result = list(result)
+
+        return result
+
+    def __reduce__(self):
+        return _operation, (self.function, self.pattern, self.args, self.kwargs)
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} {self.function} {self.pattern.source!r}>"
+
+
+def _operation(function, pattern, args, kwargs):
+    return Operation(function, pattern, *args, **kwargs)
+
+
+class Result(NamedTuple):
+    """
+    The outcome of running the operations on one document.
+
+    document is the document the operations were applied to. When worker
+    processes are used, it is a modified copy of the original document
+    rather than the original itself.
+
+    results holds the return value of each operation, in order. If an
+    operation raised an exception, it is stored in error and the remaining
+    operations were not run, so results is shorter than the list of
+    operations.
+    """
+    document: Any
+    results: List[Any]
+    error: Optional[BaseException]
+
+
+def get(glob: Glob, separator="/", **kwargs) -> Operation:
+    """
+    Return an operation that calls dpath.get(obj, glob, ...).
+    """
+    return Operation("get", glob, separator=separator, **kwargs)
+
+
+def values(glob: Glob, separator="/", afilter: Filter | None = None, dirs=True) -> Operation:
+    """
+    Return an operation that calls dpath.values(obj, glob, ...).
+    """
+    return Operation("values", glob, separator=separator, afilter=afilter, dirs=dirs)
+
+
+def search(glob: Glob, yielded=False, separator="/", afilter: Filter | None = None, dirs=True) -> Operation:
+    """
+    Return an operation that calls dpath.search(obj, glob, ...). If yielded
+    is True, the (path, value) tuples are collected into a list.
+    """
+    return Operation("search", glob, yielded, separator=separator, afilter=afilter, dirs=dirs)
+
+
+def set(glob: Glob, value, separator="/", afilter: Filter | None = None) -> Operation:
+    """
+    Return an operation that calls dpath.set(obj, glob, value, ...).
+    """
+    return Operation("set", glob, value, separator=separator, afilter=afilter)
+
+
+def delete(glob: Glob, separator="/", afilter: Filter | None = None, compact=False) -> Operation:
+    """
+    Return an operation that calls dpath.delete(obj, glob, ...).
+    """
+    return Operation("delete", glob, separator=separator, afilter=afilter, compact=compact)
+
+
+def _apply(operations: Sequence[Operation], documents: Sequence) -> List[Result]:
+    """
+    Run every operation on each of the documents. This runs in the workers.
+    """
+    results = []
+
+    for document in documents:
+        returned = []
+        error = None
+
+        for operation in operations:
+            try:
+                returned.append(operation(document))
+            except Exception as e:
+                error = e
+                break
+
+        results.append(Result(document, returned, error))
+
+    return results
+
+
+def _chunks(documents: Iterable, chunk_size: int):
+    documents = iter(documents)
+
+    while True:
+        chunk = list(islice(documents, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run(
+        operations: Sequence[Operation],
+        documents: Iterable,
+        executor: Optional[Executor] = None,
+        processes=False,
+        workers: Optional[int] = None,
+        chunk_size: int = CHUNK_SIZE
+) -> List[Result]:
+    """
+    Run each of the operations, in order, on every document, and return a
+    Result for each document, in the same order as documents.
+
+    The documents are split into chunks of chunk_size, and each chunk is
+    handed to a worker, with at most two chunks per worker waiting at a time.
+    If executor is given, its workers are used (pass workers to say how many
+    there are, if it isn't one per CPU). Otherwise a pool of threads (or
+    processes, if processes is True) is created for the call, with the given
+    number of workers.
+
+    Threads modify the documents in place. Processes work on copies, which
+    are returned in the results. Only processes run pure Python operations
+    in parallel, but everything they are sent and return has to be pickled,
+    including the documents and any afilter functions.
+    """
+    operations = tuple(operations)
+    results = []
+
+    # Enough chunks are queued to keep every worker busy, but no more, so
+    # the documents waiting to be processed (and pickled, for processes)
+    # don't depend on how many there are.
+    window = (workers or os.cpu_count() or 1) * 2
+
+    def collect(pool):
+        chunks = _chunks(documents, chunk_size)
+        pending = deque()
+
+        def submit():
+            for chunk in chunks:
+                pending.append(pool.submit(_apply, operations, chunk))
+
+                if len(pending) >= window:
+                    break
+
+        try:
+            submit()
+
+            while pending:
+                done = pending.popleft()
+                results.extend(done.result())
+                submit()
+        finally:
+            # Don't leave work nobody will collect behind if a chunk failed.
+            for future in pending:
+                future.cancel()
+
+    if executor is not None:
+        collect(executor)
+    else:
+        pool_type = ProcessPoolExecutor if processes else ThreadPoolExecutor
+        with pool_type(max_workers=workers) as pool:
+            collect(pool)
+
+    return results
@@ -0,0 +1,597 @@
+"""
+Benchmark the public dpath operations and the segments primitives on
+synthetic documents of different shapes and sizes.
+
+Each operation is timed on wide, deep, list-heavy and mixed documents, and
+its peak memory use is measured with tracemalloc. Results can be saved as
+JSON and compared with the results of an earlier run, e.g. of another
+commit:
+
+    python -m dpath.bench --save before.json
+    git checkout my-branch
+    python -m dpath.bench --compare before.json
+
+Everything is generated in memory, so no network or files are needed other
+than the ones given to --save and --compare.
+
+A few benchmarks of more specific things, such as how walking scales with
+depth, are run by name instead (see SCENARIOS):
+
+    python -m dpath.bench walk --nodes 100000
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from copy import deepcopy
+from statistics import median
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import dpath
+from dpath import ndjson, segments
+from dpath.version import VERSION
+
+# The number of nodes in the documents, by default.
+SIZES = (100, 1000, 10000)
+
+# How long each timed run of an operation lasts, at least. Faster operations
+# are called in a loop for that long.
+MIN_TIME = 0.02
+
+# The most calls in a timed run of an operation that changes the document.
+# Each of them needs its own copy of the document.
+MAX_COPIES = 32
+
+
+class Shape(NamedTuple):
+    """
+    A generated document, with the globs used to benchmark it.
+
+    leaf is the path of one leaf, parent the path of the mapping that
+    holds it, glob a glob with wildcards that matches many values and
+    recursive a glob that starts with **. overlay is a smaller document of
+    the same shape to merge into it.
+    """
+    document: Any
+    leaf: str
+    parent: str
+    glob: str
+    recursive: str
+    overlay: Any
+
+
+def wide(size: int, seed=0) -> Shape:
+    """
+    A mapping with many keys, each holding a small record.
+    """
+    count = max(size // 4, 1)
+    document = {f"key{i}": {"id": i, "name": f"name{i}", "value": i * 1.5} for i in range(count)}
+    overlay = {f"key{i}": {"value": -i, "extra": seed} for i in range(0, count, 10)}
+
+    middle = count // 2
+    return Shape(document, f"key{middle}/name", f"key{middle}", "*/name", "**/id", overlay)
+
+
+def deep(size: int, seed=0, depth=50) -> Shape:
+    """
+    A few chains of nested mappings, depth levels deep.
+    """
+    chains = max(size // (depth * 2), 1)
+
+    def chain(i, levels):
+        node = current = {}
+        for level in range(levels):
+            current["level"] = level
+            current["next"] = current = {}
+        current["end"] = i
+        return node
+
+    document = {f"chain{i}": chain(i, depth) for i in range(chains)}
+    overlay = {f"chain{i}": chain(-i, depth // 2) for i in range(0, chains, 2)}
+
+    parent = "chain0" + "/next" * (depth - 1)
+    return Shape(document, parent + "/level", parent, "*/next/next/level", "**/end", overlay)
+
+
+def lists(size: int, seed=0) -> Shape:
+    """
+    A long list of records that hold short lists themselves.
+    """
+    count = max(size // 8, 1)
+    document = {"items": [{"id": i, "tags": ["a", "b", "c"], "points": [i, i + 1]} for i in range(count)]}
+    overlay = {"items": [{"id": -i, "tags": ["d"]} for i in range(count // 10)]}
+
+    middle = count // 2
+    return Shape(document, f"items/{middle}/id", f"items/{middle}", "items/*/tags/0", "**/points/1", overlay)
+
+
+def mixed(size: int, seed=0) -> Shape:
+    """
+    Randomly nested mappings and lists, with a fixed seed.
+    """
+    rng = random.Random(seed)
+    budget = [size]
+
+    def node(depth):
+        budget[0] -= 1
+
+        if depth > 5 or budget[0] <= 0 or rng.random() < 0.3:
+            return rng.choice((rng.randint(0, 1000), f"s{rng.randint(0, 1000)}", None, True))
+
+        width = rng.randint(1, 8)
+        if rng.random() < 0.7:
+            return {f"k{rng.randint(0, 20)}": node(depth + 1) for _ in range(width)}
+
+        return [node(depth + 1) for _ in range(width)]
+
+    document = {}
+    while budget[0] > 0:
+        document[f"root{len(document)}"] = node(0)
+
+    overlay = {f"root{i}": node(1) for i in range(0, len(document), 10)}
+
+    # The deepest leaf in a mapping, so the lookups go as far down as they
+    # can and new keys can be added next to it.
+    leaf = max(
+        (path for path, found in segments.walk(document) if segments.leaf(found) and isinstance(path[-1], str)),
+        key=len
+    )
+    path = "/".join(map(str, leaf))
+    parent = "/".join(map(str, leaf[:-1]))
+
+    # Everything at the same depth as the leaf.
+    glob = "/".join("*" for _ in leaf)
+
+    return Shape(document, path, parent, glob, "**/k2", overlay)
+
+
+SHAPES: Dict[str, Callable[[int], Shape]] = {
+    "wide": wide,
+    "deep": deep,
+    "lists": lists,
+    "mixed": mixed,
+}
+
+
+class Operation(NamedTuple):
+    """
+    An operation to benchmark. prepare(shape) returns the argument passed to
+    run(), and is not timed. Operations that change their argument (mutates)
+    get a newly prepared one for every call.
+    """
+    name: str
+    prepare: Callable[[Shape], Any]
+    run: Callable[[Any], Any]
+    mutates: bool = False
+
+
+def _segments(path: str) -> tuple:
+    return tuple(int(s) if s.isdecimal() else s for s in path.split("/"))
+
+
+def _consume(iterator):
+    for _ in iterator:
+        pass
+
+
+def _copy_with_overlay(shape: Shape):
+    return deepcopy(shape.document), deepcopy(shape.overlay)
+
+
+OPERATIONS: List[Operation] = [
+    Operation("new", lambda s: (deepcopy(s.document), s.parent + "/added"), lambda a: dpath.new(a[0], a[1], 1), True),
+    Operation("set", lambda s: (deepcopy(s.document), s.glob), lambda a: dpath.set(a[0], a[1], 0), True),
+    Operation("get", lambda s: (s.document, s.leaf), lambda a: dpath.get(*a)),
+    Operation("search", lambda s: (s.document, s.glob), lambda a: dpath.search(*a)),
+    Operation("search/yielded", lambda s: (s.document, s.recursive), lambda a: _consume(dpath.search(*a, yielded=True))),
+    Operation("values", lambda s: (s.document, s.recursive), lambda a: dpath.values(*a)),
+    Operation("delete", lambda s: (deepcopy(s.document), s.glob), lambda a: dpath.delete(*a), True),
+    Operation("merge", _copy_with_overlay, lambda a: dpath.merge(*a), True),
+    Operation("view", lambda s: (s.document, s.glob.split("/")), lambda a: segments.view(*a)),
+    Operation("segments.walk", lambda s: s.document, lambda a: _consume(segments.walk(a))),
+    Operation("segments.select", lambda s: (s.document, s.recursive.split("/")), lambda a: _consume(segments.select(*a))),
+    Operation("segments.get", lambda s: (s.document, _segments(s.leaf)), lambda a: segments.get(*a)),
+    Operation("segments.has", lambda s: (s.document, _segments(s.leaf)), lambda a: segments.has(*a)),
+    Operation("segments.set", lambda s: (deepcopy(s.document), _segments(s.leaf)), lambda a: segments.set(a[0], a[1], 0), True),
+    Operation("segments.match", lambda s: (_segments(s.leaf), s.glob.split("/")), lambda a: segments.match(*a)),
+    Operation("segments.leaves", lambda s: s.document, lambda a: _consume(segments.leaves(a))),
+]
+
+
+class Result(NamedTuple):
+    shape: str
+    size: int
+    operation: str
+    best: float
+    median: float
+    runs: int
+    peak: Optional[int]
+
+
+def _batch(operation: Operation, shape: Shape, number: int) -> float:
+    """
+    Call operation number times and return how long that took. Operations
+    that change their argument get a fresh one, prepared beforehand, for
+    each call.
+    """
+    if operation.mutates:
+        arguments = [operation.prepare(shape) for _ in range(number)]
+    else:
+        arguments = [operation.prepare(shape)] * number
+
+    run = operation.run
+
+    start = time.perf_counter()
+    for argument in arguments:
+        run(argument)
+    return time.perf_counter() - start
+
+
+def _time(operation: Operation, shape: Shape, repeat: int) -> List[float]:
+    """
+    Return the time per call of each of the repeat runs of operation.
+    """
+    # Find how many calls take at least MIN_TIME, like timeit does.
+    number = 1
+    while True:
+        elapsed = _batch(operation, shape, number)
+
+        if elapsed >= MIN_TIME or operation.mutates and number >= MAX_COPIES:
+            break
+        number *= 2
+
+    timings = [elapsed / number]
+
+    for _ in range(repeat - 1):
+        timings.append(_batch(operation, shape, number) / number)
+
+    return timings
+
+
+def _peak(operation: Operation, shape: Shape) -> int:
+    """
+    Return the peak memory, in bytes, allocated by one call of operation.
+    """
+    argument = operation.prepare(shape)
+
+    tracemalloc.start()
+    try:
+        operation.run(argument)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return peak
+
+
+def run(
+        shapes=tuple(SHAPES),
+        sizes=SIZES,
+        operations: Optional[List[str]] = None,
+        repeat=5,
+        memory=True,
+        report: Optional[Callable[[Result], None]] = None
+) -> List[Result]:
+    """
+    Benchmark the operations (by name; all of them by default) on every
+    shape at every size, and return the results. report is called with
+    each result as soon as it is measured.
+    """
+    results = []
+
+    for name in shapes:
+        for size in sizes:
+            shape = SHAPES[name](size)
+
+            for operation in OPERATIONS:
+                if operations is not None and operation.name not in operations:
+                    continue
+
+                timings = _time(operation, shape, repeat)
+                peak = _peak(operation, shape) if memory else None
+
+                result = Result(name, size, operation.name, min(timings), median(timings), len(timings), peak)
+                results.append(result)
+
+                if report is not None:
+                    report(result)
+
+    return results
+
+
+def save(results: List[Result], filename: str):
+    """
+    Save results, along with the versions of Python and dpath they were
+    measured with, as JSON.
+    """
+    data = {
+        "dpath": VERSION,
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "results": [result._asdict() for result in results],
+    }
+
+    with open(filename, "w") as fp:
+        json.dump(data, fp, indent=2)
+
+
+def load(filename: str) -> Dict[tuple, Result]:
+    """
+    Load results saved by save(), keyed by (shape, size, operation).
+    """
+    with open(filename) as fp:
+        data = json.load(fp)
+
+    results = (Result(**result) for result in data["results"])
+    return {(r.shape, r.size, r.operation): r for r in results}
+
+
+def _format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3g} {unit}"
+
+    return f"{seconds / 1e-9:.3g} ns"
+
+
+def _format_bytes(size: Optional[int]) -> str:
+    if size is None:
+        return "-"
+
+    for unit, scale in (("MiB", 1 << 20), ("KiB", 1 << 10)):
+        if size >= scale:
+            return f"{size / scale:.3g} {unit}"
+
+    return f"{size} B"
+
+
+def _best(run: Callable, repeat: int, setup: Optional[Callable] = None) -> Tuple[Any, float]:
+    """
+    Call run() repeat times and return what its last call returned, along
+    with the time in seconds of its fastest call. If setup is given, each
+    call is run(setup()) instead, and setup() isn't timed.
+    """
+    best = None
+    result = None
+
+    for _ in range(repeat):
+        args = () if setup is None else (setup(),)
+
+        start = time.perf_counter()
+        result = run(*args)
+        elapsed = time.perf_counter() - start
+
+        if best is None or elapsed < best:
+            best = elapsed
+
+    return result, best
+
+
+def _count(iterator) -> int:
+    return sum(1 for _ in iterator)
+
+
+def _scenario_parser(name: str, description: str) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog=f"python -m dpath.bench {name}", description=description)
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs of each measurement (default: %(default)s)")
+    return parser
+
+
+def _comb(depth: int, nodes: int):
+    """
+    Return a chain of nested dictionaries, depth levels deep, where every
+    level also holds enough leaf keys to make about nodes nodes in total.
+    """
+    width = max(nodes // depth - 1, 0)
+
+    doc = {}
+    current = doc
+    for _ in range(depth):
+        child = {}
+        for i in range(width):
+            current[f"leaf{i}"] = i
+        current["next"] = child
+        current = child
+
+    return doc
+
+
+def bench_walk(argv=None):
+    """
+    Measure the per-node cost of segments.walk for documents of the same
+    size but different depths. If walking is independent of depth, every
+    row reports roughly the same time per node.
+
+    walk() has to materialize a path tuple for every node it yields, which
+    is inherently O(depth). The select column visits every node with a glob
+    that never matches, so no path is ever materialized.
+    """
+    parser = _scenario_parser("walk", "Measure how walking scales with the depth of a document.")
+    parser.add_argument("--nodes", type=int, default=100000, help="nodes in each document (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    print(f"{'depth':>8} {'nodes':>8} {'walk (ns/node)':>15} {'select (ns/node)':>17}")
+    for depth in (1, 10, 100, 1000, 10000):
+        doc = _comb(depth, args.nodes)
+        count, walked = _best(lambda: _count(segments.walk(doc)), args.repeat)
+        _, selected = _best(lambda: _count(segments.select(doc, ("**", "missing"))), args.repeat)
+        print(f"{depth:>8} {count:>8} {walked / count * 1e9:>15.1f} {selected / count * 1e9:>17.1f}")
+
+
+def _overlay(i: int, services=20, options=10):
+    return {
+        f"service{j}": {
+            "enabled": bool(i % 2),
+            "options": {f"option{k}": {"value": i, "tags": [i]} for k in range(options)},
+        }
+        for j in range(services)
+    }
+
+
+def _merge_each(dst, sources, flags):
+    for src in sources:
+        dpath.merge(dst, src, flags=flags)
+    return dst
+
+
+def bench_merge_many(argv=None):
+    """
+    Compare dpath.merge_many against calling dpath.merge once per source.
+
+    Every source is an overlay with the same layout as the others, which is
+    the case where calling merge() in a loop visits the same destination
+    containers once per overlay, while merge_many() visits each of them
+    once. The sources are deep-copied before every run, since merging
+    references them from the destination.
+    """
+    parser = _scenario_parser("merge_many", "Compare merge_many with merging one source at a time.")
+    parser.add_argument("--sources", type=int, default=40, help="sources to merge (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    sources = [_overlay(i) for i in range(args.sources)]
+
+    def copies():
+        return deepcopy(sources)
+
+    print(f"{'flags':>10} {'merge (ms)':>11} {'merge_many (ms)':>16}")
+    for flags in (dpath.MergeType.ADDITIVE, dpath.MergeType.REPLACE):
+        _, merged = _best(lambda srcs: _merge_each({}, srcs, flags), args.repeat, copies)
+        _, merged_many = _best(lambda srcs: dpath.merge_many({}, srcs, flags=flags), args.repeat, copies)
+        print(f"{flags.name:>10} {merged * 1e3:>11.1f} {merged_many * 1e3:>16.1f}")
+
+
+_RECORD_GLOB = "events/*/tags/0"
+
+
+def _record(i: int):
+    return {
+        "id": i,
+        "user": {"name": f"user{i}", "email": f"user{i}@example.com"},
+        "events": [{"type": "click", "at": i + j, "tags": [f"tag{j}", "x"]} for j in range(5)],
+    }
+
+
+def _values_each(filename: str) -> int:
+    count = 0
+    with open(filename, "rb") as fp:
+        for line in fp:
+            dpath.values(json.loads(line), _RECORD_GLOB)
+            count += 1
+    return count
+
+
+def bench_ndjson(argv=None):
+    """
+    Measure the throughput, in records per second, of dpath.ndjson.values
+    for different numbers of worker processes, on a temporary NDJSON file.
+    The first row reads the file line by line and calls dpath.values on each
+    record in this process, for comparison.
+    """
+    parser = _scenario_parser("ndjson", "Measure how dpath.ndjson.values scales with worker processes.")
+    parser.add_argument("--records", type=int, default=200000, help="records in the file (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    fd, filename = tempfile.mkstemp(suffix=".ndjson")
+    try:
+        with os.fdopen(fd, "w") as fp:
+            for i in range(args.records):
+                fp.write(json.dumps(_record(i)) + "\n")
+
+        print(f"{'workers':>10} {'records/s':>12}")
+        count, best = _best(lambda: _values_each(filename), args.repeat)
+        print(f"{'-':>10} {count / best:>12.0f}")
+
+        workers = 1
+        while workers <= (os.cpu_count() or 1):
+            count, best = _best(lambda: _count(ndjson.values(filename, _RECORD_GLOB, workers=workers)), args.repeat)
+            print(f"{workers:>10} {count / best:>12.0f}")
+            workers *= 2
+    finally:
+        os.unlink(filename)
+
+
+# Benchmarks of one thing each, run with python -m dpath.bench NAME [options]
+# instead of the suite.
+SCENARIOS: Dict[str, Callable] = {
+    "walk": bench_walk,
+    "merge_many": bench_merge_many,
+    "ndjson": bench_ndjson,
+}
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+
+    if argv and argv[0] in SCENARIOS:
+        return SCENARIOS[argv[0]](argv[1:])
+
+    parser = argparse.ArgumentParser(
+        prog="python -m dpath.bench",
+        description=__doc__.strip().splitlines()[0],
+        epilog=f"Other benchmarks: {', '.join(SCENARIOS)} (see python -m dpath.bench NAME --help)."
+    )
+    parser.add_argument("--shapes", default=",".join(SHAPES), help="comma separated shapes (default: %(default)s)")
+    parser.add_argument("--sizes", default=",".join(map(str, SIZES)), help="comma separated node counts (default: %(default)s)")
+    parser.add_argument("--operations", help="comma separated operations (default: all)")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs of each operation (default: %(default)s)")
+    parser.add_argument("--no-memory", action="store_true", help="don't measure peak memory")
+    parser.add_argument("--save", metavar="FILE", help="save the results as JSON")
+    parser.add_argument("--compare", metavar="FILE", help="compare with results saved earlier")
+    parser.add_argument("--list", action="store_true", help="list the shapes and operations, and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print("shapes:", ", ".join(SHAPES))
+        print("operations:", ", ".join(operation.name for operation in OPERATIONS))
+        print("other benchmarks:", ", ".join(SCENARIOS))
+        return
+
+    shapes = args.shapes.split(",")
+    for name in shapes:
+        if name not in SHAPES:
+            parser.error(f"unknown shape: {name}")
+
+    operations = None
+    if args.operations:
+        operations = args.operations.split(",")
+        known = {operation.name for operation in OPERATIONS}
+        for name in operations:
+            if name not in known:
+                parser.error(f"unknown operation: {name}")
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    baseline = load(args.compare) if args.compare else {}
+
+    header = f"{'shape':<6} {'size':>7} {'operation':<16} {'best':>10} {'median':>10} {'peak':>10}"
+    if baseline:
+        header += f" {'vs base':>8}"
+    print(header)
+
+    def report(result: Result):
+        line = (
+            f"{result.shape:<6} {result.size:>7} {result.operation:<16} "
+            f"{_format_time(result.best):>10} {_format_time(result.median):>10} {_format_bytes(result.peak):>10}"
+        )
+
+        if baseline:
+            base = baseline.get((result.shape, result.size, result.operation))
+            line += f" {result.best / base.best:>7.2f}x" if base else f" {'-':>8}"
+
+        print(line, flush=True)
+
+    results = run(shapes, sizes, operations, args.repeat, not args.no_memory, report)
+
+    if args.save:
+        save(results, args.save)
+
+
+if __name__ == "__main__":
+    main()
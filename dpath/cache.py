@@ -0,0 +1,245 @@
+"""
+Memoize queries against documents that are read far more often than they
+are changed.
+"""
+# Needed for pre-3.10 versions
+from __future__ import annotations
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, NamedTuple, Optional
+from weakref import finalize, ref
+
+import dpath
+from dpath.pattern import compile
+from dpath.types import Filter, Glob, MergeType
+
+__all__ = ["Cached", "CacheInfo", "invalidate"]
+
+_MISSING = object()
+
+# Every live Cached, by the id of its document and then by its own id, so
+# mutations made through dpath can find the caches for the document they
+# changed with one lookup. A Cached keeps its document alive, so the id
+# can't be reused while it is in here; each one removes itself when it is
+# collected.
+_caches: Dict[int, Dict[int, ref]] = {}
+_caches_lock = Lock()
+
+
+def _register(cached: "Cached"):
+    key = id(cached.document)
+
+    with _caches_lock:
+        _caches.setdefault(key, {})[id(cached)] = ref(cached)
+
+    finalize(cached, _unregister, key, id(cached))
+
+
+def _unregister(key: int, cached_key: int):
+    with _caches_lock:
+        caches = _caches.get(key)
+
+        if caches is not None:
+            caches.pop(cached_key, None)
+            if not caches:
+                del _caches[key]
+
+
+def invalidate(obj):
+    """
+    Discard the cached results of every Cached over obj. dpath.new(), set(),
+    delete() and merge() call this for the object they are given, so it only
+    has to be called after changing a document some other way.
+    """
+    caches = _caches.get(id(obj))
+    if caches is None:
+        return
+
+    for cached in [r() for r in list(caches.values())]:
+        if cached is not None and cached.document is obj:
+            cached.invalidate()
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    invalidations: int
+    maxsize: Optional[int]
+    currsize: int
+
+
+class Cached(object):
+    """
+    A document, with the results of queries against it memoized.
+
+    Results are keyed by the compiled glob and the options of the query
+    (afilter functions by identity, so pass the same function each time
+    rather than a new lambda), and the least recently used ones are evicted
+    once there are more than maxsize (None means no limit). They are all
+    discarded whenever the document is changed through dpath.new(), set(),
+    delete() or merge(), including through the methods of the same names
+    here. Changes made any other way, including through dpath on an object
+    inside the document, must be followed by a call to invalidate().
+
+    Results are shared between the calls that hit the cache, so they must
+    not be modified.
+
+    >>> config = dpath.Cached(load_config(), maxsize=1024)
+    >>> config.get('db/host')
+    'localhost'
+    >>> config.info()
+    CacheInfo(hits=0, misses=1, invalidations=0, maxsize=1024, currsize=1)
+    """
+
+    def __init__(self, document, maxsize: Optional[int] = 128):
+        self.document = document
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+        self._results = OrderedDict()
+        self._lock = Lock()
+
+        # Bumped by every invalidation, so a query that was running while the
+        # document changed doesn't store its (possibly stale) result.
+        self._generation = 0
+
+        _register(self)
+
+    def _query(self, key, function, *args, **kwargs):
+        with self._lock:
+            # Not a get() with _MISSING as the default: get() and first()
+            # cache _MISSING itself when nothing is found.
+            if key in self._results:
+                self._results.move_to_end(key)
+                self.hits += 1
+                return self._results[key]
+
+            self.misses += 1
+            generation = self._generation
+
+        result = function(self.document, *args, **kwargs)
+
+        with self._lock:
+            if generation == self._generation and self.maxsize != 0:
+                self._results[key] = result
+
+                if self.maxsize is not None and len(self._results) > self.maxsize:
+                    self._results.popitem(last=False)
+
+        return result
+
+    def get(self, glob: Glob, separator="/", default=_MISSING):
+        """
+        Same as dpath.get(document, glob, ...).
+        """
+        pattern = compile(glob, separator)
+        found = self._query(("get", pattern), dpath.get, pattern, default=_MISSING)
+
+        if found is _MISSING:
+            if default is not _MISSING:
+                return default
+
+            raise KeyError(glob)
+
+        return found
+
+    def values(self, glob: Glob, separator="/", afilter: Filter | None = None, dirs=True):
+        """
+        Same as dpath.values(document, glob, ...).
+        """
+        pattern = compile(glob, separator)
+        return self._query(("values", pattern, afilter, dirs), dpath.values, pattern, afilter=afilter, dirs=dirs)
+
+    def search(self, glob: Glob, yielded=False, separator="/", afilter: Filter | None = None, dirs=True):
+        """
+        Same as dpath.search(document, glob, ...). With yielded, the cached
+        (path, value) tuples are iterated over.
+        """
+        pattern = compile(glob, separator)
+
+        if yielded:
+            key = ("search", pattern, True, separator, afilter, dirs)
+            return iter(self._query(key, _search_list, pattern, separator, afilter, dirs))
+
+        return self._query(("search", pattern, False, afilter, dirs), dpath.search, pattern, afilter=afilter, dirs=dirs)
+
+    def first(self, glob: Glob, separator="/", afilter: Filter | None = None, dirs=True, default=_MISSING):
+        """
+        Same as dpath.first(document, glob, ...).
+        """
+        pattern = compile(glob, separator)
+        found = self._query(("first", pattern, afilter, dirs), dpath.first, pattern, afilter=afilter, dirs=dirs, default=_MISSING)
+
+        if found is _MISSING:
+            if default is not _MISSING:
+                return default
+
+            raise KeyError(glob)
+
+        return found
+
+    def exists(self, glob: Glob, separator="/", afilter: Filter | None = None, dirs=True) -> bool:
+        """
+        Same as dpath.exists(document, glob, ...).
+        """
+        pattern = compile(glob, separator)
+        return self._query(("exists", pattern, afilter, dirs), dpath.exists, pattern, afilter=afilter, dirs=dirs)
+
+    def count(self, glob: Glob, separator="/", afilter: Filter | None = None, dirs=True) -> int:
+        """
+        Same as dpath.count(document, glob, ...).
+        """
+        pattern = compile(glob, separator)
+        return self._query(("count", pattern, afilter, dirs), dpath.count, pattern, afilter=afilter, dirs=dirs)
+
+    def new(self, path, value, separator="/", creator=None):
+        """
+        Same as dpath.new(document, path, value, ...).
+        """
+        return dpath.new(self.document, path, value, separator, creator)
+
+    def set(self, glob: Glob, value, separator="/", afilter: Filter | None = None) -> int:
+        """
+        Same as dpath.set(document, glob, value, ...).
+        """
+        return dpath.set(self.document, glob, value, separator, afilter)
+
+    def delete(self, glob: Glob, separator="/", afilter: Filter | None = None, compact=False) -> int:
+        """
+        Same as dpath.delete(document, glob, ...).
+        """
+        return dpath.delete(self.document, glob, separator, afilter, compact)
+
+    def merge(self, src, separator="/", afilter: Filter | None = None, flags=MergeType.ADDITIVE):
+        """
+        Same as dpath.merge(document, src, ...).
+        """
+        return dpath.merge(self.document, src, separator, afilter, flags)
+
+    def invalidate(self):
+        """
+        Discard every cached result. Call this after changing the document
+        without going through dpath.
+        """
+        with self._lock:
+            self._results.clear()
+            self._generation += 1
+            self.invalidations += 1
+
+    def info(self) -> CacheInfo:
+        """
+        Return the hit, miss and invalidation counters, and the size of the
+        cache.
+        """
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.invalidations, self.maxsize, len(self._results))
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.document!r}, maxsize={self.maxsize!r})"
+
+
+def _search_list(document, pattern, separator, afilter, dirs):
+    return list(dpath.search(document, pattern, True, separator, afilter, dirs))
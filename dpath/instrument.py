@@ -0,0 +1,287 @@
+"""
+Opt-in counters and timings for dpath operations.
+
+While instrumentation is on, every call of a public dpath function produces
+a Stats record: how many keys it stepped through while matching, how many
+glob segment matches and afilter calls that took, how many containers it
+created, and how long it ran. Records are collected by record() blocks and
+passed to hooks:
+
+>>> with instrument.record() as records:
+...     dpath.search(document, 'users/*/email')
+>>> records[0].as_dict()
+{'operation': 'search', 'glob': 'users/*/email', 'visited': 1204, ...}
+
+When nothing is recording, the only cost is a flag check per call.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from threading import Lock
+from time import perf_counter
+from types import GeneratorType
+from typing import Callable, List, Optional
+
+from dpath.pattern import Pattern, Segment
+
+__all__ = ["Stats", "record", "add_hook", "remove_hook"]
+
+# True while any record() block is open (in any thread) or any hook is set.
+# Nothing else is looked at while it is False.
+enabled = False
+
+_lock = Lock()
+_recording = 0
+_hooks: List[Callable] = []
+
+# The callbacks of the record() blocks open in this context.
+_recorders = ContextVar("dpath_recorders", default=())
+
+# The Stats of the operation running in this context. Operations called by
+# another one (e.g. search() by values()) count towards it.
+_current = ContextVar("dpath_stats", default=None)
+
+
+class Stats(object):
+    """
+    The counters for one call of a dpath function.
+
+    operation is the name of the function and glob the first glob it
+    compiled (None for merges). visited is the number of keys stepped
+    through while matching globs or merging, matches the number of glob
+    segment matches that took, filtered the number of afilter calls and
+    created the number of containers created for results or new paths.
+    elapsed is the time spent in the function, in seconds; for yielded
+    searches, only the time spent producing results counts.
+    """
+
+    __slots__ = ("operation", "glob", "visited", "matches", "filtered", "created", "elapsed")
+
+    def __init__(self, operation: str):
+        self.operation = operation
+        self.glob = None
+        self.visited = 0
+        self.matches = 0
+        self.filtered = 0
+        self.created = 0
+        self.elapsed = 0.0
+
+    def as_dict(self) -> dict:
+        """
+        Return the counters as a plain dictionary.
+        """
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        counters = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{self.__class__.__name__}({counters})"
+
+
+def _update():
+    global enabled
+    enabled = _recording > 0 or bool(_hooks)
+
+
+@contextmanager
+def record(callback: Optional[Callable[[Stats], None]] = None):
+    """
+    Record the operations called in this context (thread or asyncio task)
+    inside the with block. The block gets the list of Stats, which grows as
+    each operation finishes; callback is also called with each of them.
+    """
+    global _recording
+
+    records = []
+
+    def collect(stats):
+        records.append(stats)
+        if callback is not None:
+            callback(stats)
+
+    token = _recorders.set(_recorders.get() + (collect,))
+
+    with _lock:
+        _recording += 1
+        _update()
+
+    try:
+        yield records
+    finally:
+        _recorders.reset(token)
+
+        with _lock:
+            _recording -= 1
+            _update()
+
+
+def add_hook(callback: Callable[[Stats], None]):
+    """
+    Call callback with the Stats of every operation, in every thread, until
+    it is removed with remove_hook().
+    """
+    with _lock:
+        _hooks.append(callback)
+        _update()
+
+
+def remove_hook(callback: Callable[[Stats], None]):
+    """
+    Stop calling a callback added with add_hook().
+    """
+    with _lock:
+        _hooks.remove(callback)
+        _update()
+
+
+def _emit(stats: Stats, callbacks):
+    for callback in callbacks:
+        callback(stats)
+
+
+def operation(name: str):
+    """
+    Decorate a public dpath function, so calling it produces a Stats record
+    while instrumentation is on.
+    """
+    def decorate(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            if not enabled or _current.get() is not None:
+                return function(*args, **kwargs)
+
+            callbacks = _recorders.get() + tuple(_hooks)
+            if not callbacks:
+                return function(*args, **kwargs)
+
+            stats = Stats(name)
+            token = _current.set(stats)
+            start = perf_counter()
+
+            try:
+                result = function(*args, **kwargs)
+            except BaseException:
+                stats.elapsed += perf_counter() - start
+                _emit(stats, callbacks)
+                raise
+            finally:
+                _current.reset(token)
+
+            stats.elapsed += perf_counter() - start
+
+            if isinstance(result, GeneratorType):
+                return _tracked(result, stats, callbacks)
+
+            _emit(stats, callbacks)
+            return result
+
+        return wrapper
+
+    return decorate
+
+
+def _tracked(generator, stats: Stats, callbacks):
+    """
+    Yield from generator, adding the time it takes to produce each value to
+    stats. The stats are emitted once the generator is done or closed.
+    """
+    try:
+        while True:
+            token = _current.set(stats)
+            start = perf_counter()
+
+            try:
+                value = next(generator)
+            except StopIteration:
+                return
+            finally:
+                stats.elapsed += perf_counter() - start
+                _current.reset(token)
+
+            yield value
+    finally:
+        _emit(stats, callbacks)
+
+
+class _CountingSegment(Segment):
+    __slots__ = ("_stats",)
+
+    def match(self, key, size: Optional[int] = None) -> bool:
+        self._stats.matches += 1
+        return Segment.match(self, key, size)
+
+
+class _CountingPattern(Pattern):
+    """
+    A copy of a pattern that counts the keys it steps through and the
+    segment matches that takes.
+    """
+
+    def step(self, state, key, size: Optional[int] = None):
+        self._stats.visited += 1
+        return Pattern.step(self, state, key, size)
+
+
+def _counting_segment(segment: Segment, stats: Stats) -> Segment:
+    counting = _CountingSegment.__new__(_CountingSegment)
+    for name in Segment.__slots__:
+        setattr(counting, name, getattr(segment, name))
+    counting._stats = stats
+    return counting
+
+
+def counting(pattern: Pattern) -> Pattern:
+    """
+    Return a version of pattern that counts towards the operation running
+    in this context, if there is one, or pattern itself.
+    """
+    stats = _current.get()
+    if stats is None:
+        return pattern
+
+    if stats.glob is None:
+        stats.glob = pattern.source
+
+    copied = _CountingPattern.__new__(_CountingPattern)
+    copied.__dict__.update(pattern.__dict__)
+    copied.prefix = tuple(_counting_segment(s, stats) for s in pattern.prefix)
+    copied.suffix = tuple(_counting_segment(s, stats) for s in pattern.suffix)
+    copied._stats = stats
+
+    return copied
+
+
+def looked_up(pattern: Pattern):
+    """
+    Count the keys of a literal pattern resolved by segments.lookup(), which
+    indexes into the document directly rather than stepping through keys,
+    towards the operation running in this context, if there is one. Each
+    segment counts as one key visited and one segment match; a lookup that
+    stops at a missing key is counted in full.
+    """
+    stats = _current.get()
+    if stats is not None:
+        stats.visited += len(pattern.prefix)
+        stats.matches += len(pattern.prefix)
+
+
+def counting_filter(afilter: Optional[Callable]) -> Optional[Callable]:
+    """
+    Return a version of afilter that counts its calls towards the operation
+    running in this context, if there is one, or afilter itself.
+    """
+    stats = _current.get()
+    if stats is None or afilter is None:
+        return afilter
+
+    def counted(value):
+        stats.filtered += 1
+        return afilter(value)
+
+    return counted
+
+
+def current() -> Optional[Stats]:
+    """
+    Return the Stats of the operation running in this context, or None.
+    """
+    return _current.get()
@@ -0,0 +1,129 @@
+from collections.abc import Mapping, MutableSequence, Sequence
+from copy import copy, deepcopy
+from typing import Tuple
+
+from dpath import segments
+from dpath.types import MergeType, PathSegment
+
+
+class Layered(Mapping):
+    """
+    A read-only view of a stack of documents, as if they had been merged.
+
+    Layers are given in the order they would be passed to merge_many(): each
+    layer is overlaid on the ones before it. Values are resolved across the
+    layers on access, following the same rules as merge(), so nothing is
+    copied and none of the layers are modified. Mappings that would be
+    merged together are returned as Layered views themselves.
+
+    Since a Layered is a Mapping, it can be passed to get(), search(),
+    values() and the rest of the read-only API. Use materialize() to get a
+    plain copy of the merged document.
+
+    >>> defaults = {'db': {'host': 'localhost', 'port': 5432}}
+    >>> tenant = {'db': {'host': 'db.example.com'}}
+    >>> dpath.get(Layered(defaults, tenant), 'db/host')
+    'db.example.com'
+    """
+
+    def __init__(self, *layers: Mapping, flags=MergeType.ADDITIVE, _path: Tuple[PathSegment, ...] = ()):
+        self.layers = layers
+        self.flags = flags
+        self._path = _path
+
+        # Testing flag members is slow, so it is only done once.
+        self._typesafe = bool(flags & MergeType.TYPESAFE)
+        self._additive = bool(flags & MergeType.ADDITIVE)
+        self._replace = bool(flags & MergeType.REPLACE)
+
+    def __getitem__(self, key):
+        found_all = [layer[key] for layer in self.layers if key in layer]
+
+        if not found_all:
+            raise KeyError(key)
+
+        return self._resolve(key, found_all)
+
+    def _resolve(self, key, found_all):
+        """
+        Fold the values that the layers have for key, in order, the same way
+        merge() would fold them into a destination.
+        """
+        target = found_all[0]
+
+        # The mappings that would be merged into target so far.
+        merging = [target]
+
+        for found in found_all[1:]:
+            if self._typesafe:
+                tt = type(target)
+                ft = type(found)
+                if tt != ft:
+                    path = "/".join(map(segments.int_str, self._path + (key,)))
+                    raise TypeError(f"Cannot merge objects of type {tt} and {ft} at {path}")
+
+            # Any two mappings can be merged, since none of them is modified.
+            mapP = isinstance(target, Mapping) and isinstance(found, Mapping)
+            seqP = isinstance(target, MutableSequence) and isinstance(found, MutableSequence)
+
+            # If the types don't match, or target is a leaf, replace it.
+            if (type(found) is not type(target) and not (mapP or seqP)) or segments.leaf(target):
+                target = found
+                merging = [target]
+                continue
+
+            if mapP:
+                if self._additive or self._replace:
+                    merging.append(found)
+            elif self._additive:
+                # Adding to an immutable sequence would not change it in the
+                # merged document either.
+                if seqP:
+                    target = copy(target)
+                    target += found
+            elif self._replace and isinstance(target, Sequence):
+                target = found
+                merging = [target]
+
+        if len(merging) > 1:
+            return self.__class__(*merging, flags=self.flags, _path=self._path + (key,))
+
+        return target
+
+    def __contains__(self, key):
+        return any(key in layer for layer in self.layers)
+
+    def __iter__(self):
+        # Keys come out in the order they are first seen, which is the order
+        # merging the layers into an empty mapping would add them.
+        seen = set()
+
+        for layer in self.layers:
+            for key in layer:
+                if key not in seen:
+                    seen.add(key)
+                    yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def materialize(self) -> dict:
+        """
+        Return the merged document as plain nested dictionaries. Values are
+        deep copies, so the result can be modified without affecting any of
+        the layers.
+
+        materialize() -> dict
+        """
+        result = {}
+
+        for key, value in self.items():
+            if isinstance(value, Layered):
+                result[key] = value.materialize()
+            else:
+                result[key] = deepcopy(value)
+
+        return result
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({', '.join(map(repr, self.layers))})"
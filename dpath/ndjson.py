@@ -0,0 +1,138 @@
+"""
+Run a glob over every record of a newline-delimited JSON (NDJSON) file, in
+parallel.
+
+The file is memory-mapped and split into chunks that end on line boundaries.
+Each chunk is handed to a worker process as a byte range, so records are
+never sent between processes; only the values that match are.
+"""
+# Needed for pre-3.10 versions
+from __future__ import annotations
+
+import json
+import mmap
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Iterator, List, Tuple, Any, Optional
+
+import dpath
+from dpath.pattern import Pattern, compile
+from dpath.types import Filter, Glob
+
+__all__ = ["values"]
+
+# The size of the byte range given to a worker at a time.
+CHUNK_SIZE = 1 << 22
+
+
+def _chunks(filename, chunk_size: int) -> Iterator[Tuple[int, int]]:
+    """
+    Yield (start, end) byte ranges that cover the file, each ending just
+    after a newline (or at the end of the file).
+    """
+    with open(filename, "rb") as fp:
+        size = os.fstat(fp.fileno()).st_size
+
+        # Empty files can't be mapped.
+        if size == 0:
+            return
+
+        with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            start = 0
+
+            while start < size:
+                end = mapped.find(b"\n", min(start + chunk_size, size) - 1)
+                end = size if end < 0 else end + 1
+
+                yield start, end
+                start = end
+
+
+def _extract(filename, start: int, end: int, pattern: Pattern, afilter: Optional[Filter], dirs: bool):
+    """
+    Return the (offset, values) pairs for the records between start and end.
+    This runs in the worker processes.
+    """
+    results = []
+
+    with open(filename, "rb") as fp:
+        with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            offset = start
+
+            while offset < end:
+                newline = mapped.find(b"\n", offset, end)
+                following = end if newline < 0 else newline + 1
+
+                line = mapped[offset:following]
+                if line.strip():
+                    record = json.loads(line)
+                    results.append((offset, dpath.values(record, pattern, afilter=afilter, dirs=dirs)))
+
+                offset = following
+
+    return results
+
+
+def values(
+        filename,
+        glob: Glob,
+        separator="/",
+        afilter: Filter | None = None,
+        dirs=True,
+        workers: Optional[int] = None,
+        ordered=True,
+        chunk_size: int = CHUNK_SIZE
+) -> Iterator[Tuple[int, List[Any]]]:
+    """
+    Run dpath.values(record, glob) on every record in an NDJSON file, using a
+    pool of worker processes. Yields (offset, values) tuples, where offset is
+    the position in the file of the line that held the record. Blank lines
+    are skipped.
+
+    Results are yielded in file order. If ordered is False, the results for
+    each chunk are yielded as soon as that chunk is done instead, which keeps
+    the workers busy when some chunks take much longer than others.
+
+    workers is the number of processes to use (by default, one per CPU).
+    afilter is called in the worker processes, so it has to be picklable,
+    e.g. a function defined at the top level of a module.
+    """
+    pattern = compile(glob, separator)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    # Enough chunks are queued to keep every worker busy while results are
+    # consumed, but no more, so memory use doesn't depend on the file size.
+    window = workers * 2
+    chunks = _chunks(filename, chunk_size)
+    pending = deque()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        def submit():
+            for start, end in chunks:
+                pending.append(executor.submit(_extract, filename, start, end, pattern, afilter, dirs))
+
+                if len(pending) >= window:
+                    break
+
+        try:
+            submit()
+
+            while pending:
+                if ordered:
+                    done = pending.popleft()
+                else:
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    done = finished.pop()
+                    pending.remove(done)
+
+                results = done.result()
+                submit()
+
+                yield from results
+        finally:
+            # The consumer may stop early; don't wait for work nobody wants.
+            for future in pending:
+                future.cancel()
@@ -0,0 +1,293 @@
+import re
+from collections.abc import Sequence
+from fnmatch import translate
+from functools import lru_cache
+from typing import Tuple, Optional
+
+from dpath.exceptions import InvalidGlob
+from dpath.types import Glob
+
+# Characters that give a glob segment a meaning other than a literal key.
+_MAGIC = re.compile(r'[*?[]')
+_MAGIC_BYTES = re.compile(br'[*?[]')
+
+
+class Segment(object):
+    """
+    A single compiled glob segment.
+
+    Matching follows the rules of segments.match: integer keys are compared
+    numerically when the glob converts to an int, and otherwise everything is
+    compared with fnmatch.fnmatchcase semantics.
+    """
+
+    __slots__ = ("glob", "index", "literal", "_regex")
+
+    def __init__(self, glob):
+        self.glob = glob
+
+        try:
+            self.index = int(glob)
+        except Exception:
+            self.index = None
+
+        if isinstance(glob, str):
+            self.literal = _MAGIC.search(glob) is None
+            self._regex = re.compile(translate(glob)).match
+        elif isinstance(glob, bytes):
+            self.literal = _MAGIC_BYTES.search(glob) is None
+            self._regex = re.compile(translate(str(glob, 'ISO-8859-1')).encode('ISO-8859-1')).match
+        else:
+            # Only integer keys can ever match a glob segment that is neither
+            # str nor bytes.
+            self.literal = self.index is not None
+            self._regex = None
+
+    def match(self, key, size: Optional[int] = None) -> bool:
+        """
+        Return True if key matches this segment, otherwise False.
+
+        If key is an index into a sequence, size is the length of that
+        sequence and negative segments count back from its end.
+
+        match(key) -> bool
+        """
+        if isinstance(key, int):
+            index = self.index
+
+            if index is not None:
+                return key == index or (size is not None and key == size + index)
+
+            key = str(key)
+
+        if self.literal and key.__class__ is self.glob.__class__:
+            return key == self.glob
+
+        if self._regex is None:
+            return False
+
+        try:
+            return self._regex(key) is not None
+        except TypeError:
+            return False
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} {self.glob!r}>"
+
+
+def star(key) -> bool:
+    """
+    Return True if key can be consumed by a star-star segment.
+
+    Star-star expands to star segments that take the type of the key they are
+    matched against, so every str, bytes or int key matches.
+
+    star(key) -> bool
+    """
+    return isinstance(key, (str, bytes, int))
+
+
+class Pattern(Sequence):
+    """
+    A glob that has been split and compiled once so that it can be matched
+    against many paths cheaply.
+
+    A pattern is a sequence of the original glob segments, so it can be used
+    anywhere a list glob is accepted.
+    """
+
+    def __init__(self, segments: Glob, source: Optional[Glob] = None):
+        segments = tuple(segments)
+
+        self.segments: Tuple = segments
+        self.source = segments if source is None else source
+
+        if '**' in segments:
+            ss = segments.index('**')
+
+            if '**' in segments[ss + 1:]:
+                raise InvalidGlob(f"Invalid glob. Only one '**' is permitted per glob: {segments}")
+
+            self.recursive = True
+            self.prefix = tuple(map(Segment, segments[:ss]))
+            self.suffix = tuple(map(Segment, segments[ss + 1:]))
+        else:
+            self.recursive = False
+            self.prefix = tuple(map(Segment, segments))
+            self.suffix = ()
+
+        # A literal pattern has no wildcards, so it can be resolved by direct
+        # lookups instead of by matching keys.
+        self.literal = not self.recursive and all(s.literal for s in self.prefix)
+
+    @property
+    def start(self):
+        """
+        The state to step from for the children of the root object, or None if
+        the pattern cannot match anything.
+
+        States are opaque to callers: pass them to step() and lookup() only.
+        """
+        if self.prefix:
+            return 0
+
+        if self.recursive:
+            return (0,)
+
+        return None
+
+    def lookup(self, state) -> Optional[Segment]:
+        """
+        Return the segment that a child key must match to advance from state,
+        or None if any key might advance it (star-star).
+
+        lookup(state) -> Segment
+        """
+        if state.__class__ is int:
+            return self.prefix[state]
+        return None
+
+    def may_match(self, state) -> bool:
+        """
+        Return False if no key stepped from state can match the whole pattern,
+        so only the descendants of those keys can. This errs on the side of
+        True.
+
+        may_match(state) -> bool
+        """
+        if state.__class__ is int:
+            return state + 1 == len(self.prefix)
+        return True
+
+    def step(self, state, key, size: Optional[int] = None):
+        """
+        Advance state by one path segment. If key is an index into a
+        sequence, size should be the length of that sequence so negative
+        segments can match.
+
+        Returns a (following, matched) tuple: following is the state for the
+        children of key (None if no descendant can match) and matched is True
+        when the path ending in key matches the whole pattern.
+
+        Past the star-star segment the state is the tuple of suffix positions
+        that are still in play, so the suffix is matched without knowing the
+        final length of the path in advance.
+
+        step(state, key) -> (state, bool)
+        """
+        if state.__class__ is int:
+            prefix = self.prefix
+
+            if not prefix[state].match(key, size):
+                return None, False
+
+            state += 1
+            if state < len(prefix):
+                return state, False
+
+            if not self.recursive:
+                return None, True
+
+            return (0,), not self.suffix
+
+        suffix = self.suffix
+        suffix_len = len(suffix)
+
+        following = []
+        if state[0] == 0 and star(key):
+            following.append(0)
+
+        for i in state:
+            if i < suffix_len and suffix[i].match(key, size):
+                following.append(i + 1)
+
+        if not following:
+            return None, False
+
+        matched = following[-1] == suffix_len
+        if following[0] == 0 or following[0] < suffix_len:
+            return tuple(following), matched
+
+        return None, matched
+
+    def match(self, path) -> bool:
+        """
+        Return True if the path segments match this pattern, otherwise False.
+
+        This is equivalent to segments.match(path, pattern.segments).
+
+        match(path) -> bool
+        """
+        prefix = self.prefix
+        suffix = self.suffix
+        path_len = len(path)
+        prefix_len = len(prefix)
+        suffix_len = len(suffix)
+
+        if self.recursive:
+            if path_len < prefix_len + suffix_len:
+                return False
+        elif path_len != prefix_len:
+            return False
+
+        for i in range(prefix_len):
+            if not prefix[i].match(path[i]):
+                return False
+
+        if self.recursive:
+            start = path_len - suffix_len
+
+            for i in range(prefix_len, start):
+                if not star(path[i]):
+                    return False
+
+            for i in range(suffix_len):
+                if not suffix[i].match(path[start + i]):
+                    return False
+
+        return True
+
+    def __getitem__(self, index):
+        return self.segments[index]
+
+    def __len__(self):
+        return len(self.segments)
+
+    def __eq__(self, other):
+        if isinstance(other, Pattern):
+            return self.segments == other.segments
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.segments)
+
+    def __reduce__(self):
+        return self.__class__, (self.segments, self.source)
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} {self.source!r}>"
+
+
+@lru_cache(maxsize=1024)
+def _compile_str(glob: str, separator: str) -> Pattern:
+    return Pattern(glob.lstrip(separator).split(separator), glob)
+
+
+def compile(glob: Glob, separator="/") -> Pattern:
+    """
+    Compile a glob into a Pattern which can be passed to any function that
+    accepts a glob.
+
+    String globs are split with separator the same way every other function
+    splits them; list globs are used as-is and separator is ignored. Compiled
+    string globs are cached, and compiling a Pattern returns it unchanged.
+
+    compile(glob) -> Pattern
+    """
+    if isinstance(glob, Pattern):
+        return glob
+
+    if isinstance(glob, str):
+        return _compile_str(glob, separator)
+
+    return Pattern(glob)
@@ -0,0 +1,226 @@
+"""
+Change documents without changing them in place.
+
+Each function here takes the same arguments as its counterpart in dpath, but
+leaves the document it is given untouched and returns a new version of it
+instead. Only the containers on the way to a change are copied (shallowly);
+everything else is shared between the old and new versions, so a change
+costs about as much as the depth of the document rather than its size:
+
+>>> v1 = {'db': {'host': 'localhost', 'port': 5432}, 'users': [...]}
+>>> v2 = persistent.set(v1, 'db/host', 'db.example.com')
+>>> v1['db']['host'], v2['db']['host']
+('localhost', 'db.example.com')
+>>> v1['users'] is v2['users']
+True
+
+Since versions share their containers, they must only be changed through
+these functions. Changing one of them in place (e.g. with dpath.set) may
+change the others too.
+"""
+# Needed for pre-3.10 versions
+from __future__ import annotations
+
+from collections.abc import MutableSequence, Sequence
+from copy import copy
+from typing import Iterable, List, Tuple
+
+import dpath
+from dpath import segments
+from dpath.exceptions import PathNotFound
+from dpath.pattern import Pattern, compile
+from dpath.types import Creator, Filter, Glob, MergeType, Path, PathSegment
+
+__all__ = ["new", "set", "delete", "merge", "merge_many"]
+
+
+def _thaw(obj, paths: Iterable[Sequence[PathSegment]]):
+    """
+    Return a shallow copy of obj in which the containers along each of the
+    paths are shallow copies too, so they can be changed without changing
+    obj. Each path is followed until a key is missing or holds a leaf.
+
+    Immutable sequences along the paths are rebuilt with the copies in place,
+    so the containers below them can be changed. They still can't be changed
+    themselves, as with dpath.set() and dpath.delete().
+    """
+    root = copy(obj)
+
+    # Copies by the id of the (copied) parent they were put into and their
+    # key, so containers shared by several paths are copied once.
+    copies = {}
+
+    # Immutable sequences (e.g. tuples) can't take the copies of their
+    # children, so they are copied as lists and rebuilt once every path is
+    # thawed, as (depth, parent, key, type) for each of them.
+    frozen = []
+
+    for path in paths:
+        current = root
+
+        for depth, key in enumerate(path):
+            if isinstance(current, Sequence) and isinstance(key, str) and key.isdecimal():
+                key = int(key)
+
+            copied = copies.get((id(current), key))
+
+            if copied is None:
+                try:
+                    found = current[key]
+                except (KeyError, IndexError, TypeError):
+                    break
+
+                if segments.leaf(found):
+                    break
+
+                if isinstance(found, Sequence) and not isinstance(found, MutableSequence):
+                    copied = list(found)
+                    frozen.append((depth, current, key, type(found)))
+                else:
+                    copied = copy(found)
+
+                copies[id(current), key] = copied
+                current[key] = copied
+
+            current = copied
+
+    # The deepest first, so sequences inside them are rebuilt already.
+    for _, parent, key, kind in sorted(frozen, key=lambda f: f[0], reverse=True):
+        # Named tuples take their fields as separate arguments.
+        parent[key] = getattr(kind, "_make", kind)(parent[key])
+
+    return root
+
+
+def _parents(obj, pattern: Pattern, afilter: Filter | None) -> List[Tuple]:
+    """
+    Return the paths of the containers that set() and delete() would change
+    for the matches of pattern in obj.
+    """
+    parents = []
+
+    matches = segments._select(obj, pattern)
+    changed = None
+
+    while True:
+        try:
+            location, parent, found = matches.send(changed)
+        except StopIteration:
+            break
+
+        changed = hasattr(parent, "__getitem__") and (not afilter or segments.leaf(found) and afilter(found))
+
+        if changed:
+            parent = location.parent
+            parents.append(parent.segments() if parent.__class__ is segments.Location else parent)
+
+    return parents
+
+
+def _containers(src) -> List[Tuple]:
+    """
+    Return the paths of the containers in src whose counterparts in a
+    destination merging src may change.
+
+    Merging never merges into the elements of a sequence: depending on the
+    flags, the sequence in the destination is extended, replaced or left
+    alone. So nothing inside sequences is included.
+    """
+    containers = []
+
+    found_all = segments._select(src, compile('**'))
+    skip = None
+
+    while True:
+        try:
+            location, _, found = found_all.send(skip)
+        except StopIteration:
+            break
+
+        skip = None
+
+        if not segments.leaf(found):
+            containers.append(location.segments())
+            skip = isinstance(found, MutableSequence)
+
+    return containers
+
+
+def new(obj, path: Path, value, separator="/", creator: Creator | None = None):
+    """
+    Return a new version of obj with the element at the terminus of path set
+    to value, like dpath.new().
+    """
+    split_segments = dpath._split_path(path, separator)
+
+    thawed = _thaw(obj, (split_segments[:-1],))
+    dpath.new(thawed, split_segments, value, separator, creator)
+
+    return thawed
+
+
+def set(obj, glob: Glob, value, separator="/", afilter: Filter | None = None):
+    """
+    Return a new version of obj with every element that matches the glob set
+    to value, like dpath.set(). If nothing matches, obj itself is returned.
+
+    afilter is called twice for each match.
+    """
+    pattern = compile(glob, separator)
+
+    parents = _parents(obj, pattern, afilter)
+    if not parents:
+        return obj
+
+    thawed = _thaw(obj, parents)
+    dpath.set(thawed, pattern, value, afilter=afilter)
+
+    return thawed
+
+
+def delete(obj, glob: Glob, separator="/", afilter: Filter | None = None, compact=False):
+    """
+    Return a new version of obj without the elements that match the glob, like
+    dpath.delete(). Raises PathNotFound if nothing matches.
+
+    afilter is called twice for each match.
+    """
+    # As in dpath.delete(), an afilter selects leaves anywhere in obj.
+    pattern = compile('**' if afilter else glob, separator)
+
+    parents = _parents(obj, pattern, afilter)
+    if not parents:
+        raise PathNotFound(f"Could not find {glob} to delete it")
+
+    thawed = _thaw(obj, parents)
+    dpath.delete(thawed, pattern, afilter=afilter, compact=compact)
+
+    return thawed
+
+
+def merge(dst, src, separator="/", afilter: Filter | None = None, flags=MergeType.ADDITIVE):
+    """
+    Return a new version of dst with src merged into it, like dpath.merge().
+
+    As with dpath.merge(), the new version REFERENCES the parts of src that
+    are not in dst, so src must not be changed in place afterwards either.
+    """
+    return merge_many(dst, (src,), separator, afilter, flags)
+
+
+def merge_many(dst, sources, separator="/", afilter: Filter | None = None, flags=MergeType.ADDITIVE):
+    """
+    Return a new version of dst with each of the sources merged into it, in
+    order, like dpath.merge_many().
+    """
+    for src in sources:
+        if afilter is not None:
+            src = dpath.search(src, '**', afilter=afilter)
+
+        # Merging only changes the containers of dst that src has containers
+        # for. Each source is merged separately, since merging one may put
+        # containers from it into dst that the next would change.
+        dst = _thaw(dst, _containers(src))
+        dpath.merge_many(dst, (src,), separator, flags=flags)
+
+    return dst
@@ -1,9 +1,11 @@
+from collections.abc import Mapping
 from copy import deepcopy
 from fnmatch import fnmatchcase
 from typing import Sequence, Tuple, Iterator, Any, Union, Optional, MutableMapping, MutableSequence
 
 from dpath import options
 from dpath.exceptions import InvalidGlob, InvalidKeyName, PathNotFound
+from dpath.pattern import Pattern
 from dpath.types import PathSegment, Creator, Hints, Glob, Path, ListIndex
 
 
@@ -15,16 +17,31 @@ def make_walkable(node) -> Iterator[Tuple[PathSegment, Any]]:
     * For sequence nodes (lists/tuples/etc.) a zip between index number and index value will be returned.
     * Edge cases will result in an empty iterator being returned.
 
+    Sequence indices are ListIndex objects, so they also compare equal to
+    negative indices.
+
     make_walkable(node) -> (generator -> (key, value))
     """
+    size = _size(node)
+
+    if size is None:
+        return _walkable(node)
+
+    # Convert all list indices to objects so negative indices are supported.
+    return zip((ListIndex(i, size) for i in range(size)), node)
+
+
+def _walkable(node) -> Iterator[Tuple[PathSegment, Any]]:
+    """
+    Same as make_walkable(node), but sequence indices are plain ints, which
+    are cheaper to make. Negative glob indices are resolved against the
+    length of the sequence while matching instead (see select()).
+    """
     try:
         return iter(node.items())
     except AttributeError:
         try:
-            indices = range(len(node))
-            # Convert all list indices to objects so negative indices are supported.
-            indices = map(lambda i: ListIndex(i, len(node)), indices)
-            return zip(indices, node)
+            return zip(range(len(node)), node)
         except TypeError:
             # This can happen in cases where the node isn't leaf(node) == True,
             # but also isn't actually iterable. Instead of this being an error
@@ -54,31 +71,148 @@ def leafy(thing):
         return False
 
 
+class Location(object):
+    """
+    A path inside a walked object, stored as a key and a link to the location
+    of its parent.
+
+    Creating a location costs the same at every depth, and its segments are
+    only materialized into a tuple when they are asked for. The segments of
+    the parent location are cached at that point, so materializing sibling
+    locations is cheap.
+
+    The outermost location links to a tuple (usually empty) instead of a
+    parent location; it is prepended to the materialized segments.
+    """
+
+    __slots__ = ("parent", "key", "_segments")
+
+    def __init__(self, parent: Union["Location", Tuple], key: PathSegment):
+        self.parent = parent
+        self.key = key
+        self._segments = None
+
+    def segments(self) -> Tuple:
+        """
+        Return the path segments leading to this location.
+
+        segments() -> (segment0, segment1, ...)
+        """
+        segments = self._segments
+
+        if segments is None:
+            parent = self.parent
+
+            if parent.__class__ is Location:
+                base = parent._segments
+                if base is None:
+                    base = parent._segments = parent._unwind()
+            else:
+                base = parent
+
+            segments = self._segments = base + (self.key,)
+
+        return segments
+
+    def _unwind(self) -> Tuple:
+        # Collect keys iteratively, since locations may be nested deeper than
+        # the recursion limit.
+        keys = []
+        location = self
+
+        while location.__class__ is Location and location._segments is None:
+            keys.append(location.key)
+            location = location.parent
+
+        if location.__class__ is Location:
+            location = location._segments
+
+        keys.reverse()
+        return location + tuple(keys)
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} {self.segments()!r}>"
+
+
+def _size(node) -> Optional[int]:
+    """
+    Return the length of node if make_walkable(node) enumerates it by index,
+    otherwise None.
+    """
+    if hasattr(node, "items"):
+        return None
+
+    try:
+        return len(node)
+    except TypeError:
+        return None
+
+
+def _invalid_key(key) -> bool:
+    """
+    Return True if key is empty and empty keys are not allowed.
+    """
+    try:
+        length = len(key)
+    except TypeError:
+        return False
+
+    return length == 0 and not options.ALLOW_EMPTY_STRING_KEYS
+
+
+def _check_key(key, location):
+    """
+    Raise InvalidKeyName if key is empty and empty keys are not allowed.
+    """
+    if _invalid_key(key):
+        raise InvalidKeyName("Empty string keys not allowed without "
+                             "dpath.options.ALLOW_EMPTY_STRING_KEYS=True: "
+                             f"{Location(location, key).segments()}")
+
+
 def walk(obj, location=()):
     """
     Yield all valid (segments, value) pairs (from a breadth-first
     search, right-to-left on sequences).
 
+    All children of an object are yielded before any of them are walked
+    themselves. The walk keeps an explicit stack instead of recursing, so
+    arbitrarily deep objects can be walked and each pair is yielded directly
+    instead of passing through one generator per level.
+
+    Sequence indices are yielded as ListIndex, which knows the length of
+    its sequence, so the paths can be checked with match() against globs
+    that have negative indices.
+
     walk(obj) -> (generator -> (segments, value))
     """
-    if not leaf(obj):
-        for k, v in make_walkable(obj):
-            length = None
+    if leaf(obj):
+        return
 
-            try:
-                length = len(k)
-            except TypeError:
-                pass
+    stack = [iter(((location, obj),))]
+
+    while stack:
+        for location, node in stack[-1]:
+            descend = []
+            size = _size(node)
 
-            if length is not None and length == 0 and not options.ALLOW_EMPTY_STRING_KEYS:
-                raise InvalidKeyName("Empty string keys not allowed without "
-                                     "dpath.options.ALLOW_EMPTY_STRING_KEYS=True: "
-                                     f"{location + (k,)}")
-            yield (location + (k,)), v
+            for k, v in _walkable(node):
+                _check_key(k, location)
 
-        for k, v in make_walkable(obj):
-            for found in walk(v, location + (k,)):
-                yield found
+                if size is not None:
+                    k = ListIndex(k, size)
+
+                path = location + (k,)
+                yield path, v
+
+                if not leaf(v):
+                    descend.append((path, v))
+
+            if descend:
+                stack.append(iter(descend))
+            break
+        else:
+            stack.pop()
 
 
 def get(obj, segments: Path):
@@ -186,8 +320,14 @@ def match(segments: Path, glob: Glob):
     fnmatch.fnmatchcase returns True. If fnmatchcase returns False or
     throws an exception the result will be False.
 
+    A compiled Pattern may be given as the glob, in which case its
+    precompiled segments are used instead.
+
     match(segments, glob) -> bool
     """
+    if isinstance(glob, Pattern):
+        return glob.match(segments)
+
     segments = tuple(segments)
     glob = tuple(glob)
 
@@ -257,6 +397,311 @@ def match(segments: Path, glob: Glob):
     return False
 
 
+# The globs that match bool keys by name, since integer keys are matched as
+# strings when the glob isn't an integer.
+_BOOL_NAMES = frozenset(("True", "False"))
+
+
+def _direct(node, segment):
+    """
+    Return the list of (key, value) pairs of node that match a literal
+    segment by indexing node directly, or None if that is not possible.
+    """
+    glob = segment.glob
+    index = segment.index
+
+    if isinstance(node, Mapping):
+        # A key equal to the index may be an int, but also a bool, a float
+        # or anything else that hashes the same, and indexing can't tell
+        # which. Those that match the segment (and the order they come in,
+        # next to a string key) are found by iteration instead, as are the
+        # bool keys that match their names.
+        if index is not None and index in node:
+            return None
+
+        if not isinstance(glob, (str, bytes)):
+            return []
+
+        if glob in _BOOL_NAMES:
+            return None
+
+        if glob in node:
+            return [(glob, node[glob])]
+
+        return []
+
+    if isinstance(node, Sequence):
+        if index is None:
+            return []
+
+        length = len(node)
+        i = index + length if index < 0 else index
+
+        if 0 <= i < length:
+            return [(i, node[i])]
+
+        return []
+
+    return None
+
+
+def candidates(node, segment) -> Iterator[Tuple[PathSegment, Any]]:
+    """
+    Returns an iterator of the (key, value) pairs of node that might match the
+    compiled glob segment.
+
+    Literal segments are resolved with direct lookups on mappings and
+    sequences. Otherwise (or when the lookup is ambiguous) this is the same as
+    _walkable(node).
+
+    candidates(node, segment) -> (generator -> (key, value))
+    """
+    if segment is not None and segment.literal:
+        found = _direct(node, segment)
+
+        if found is not None:
+            return iter(found)
+
+    return _walkable(node)
+
+
+def select(obj, glob: Glob, location=()):
+    """
+    Yield all (segments, value) pairs in obj that match glob, in the same
+    order as walk(obj) would produce them.
+
+    Unlike filtering walk(obj) with match(), only the branches of obj that
+    can still match the remaining glob are visited. Literal segments become
+    direct lookups, star segments enumerate a single level and star-star
+    segments are only expanded below the point where they appear.
+
+    select(obj, glob) -> (generator -> (segments, value))
+    """
+    pattern = glob if isinstance(glob, Pattern) else Pattern(glob)
+
+    return ((path.segments(), value) for path, _, value in _select(obj, pattern, location))
+
+
+def lookup(obj, glob: Glob) -> list:
+    """
+    Return the values in obj that match a literal glob (one without any
+    wildcards).
+
+    Each segment is resolved by indexing directly into the current object,
+    using the same key rules as match(): segments that convert to integers
+    also index sequences (negative ones from the end). This costs O(depth)
+    instead of a walk. If a segment cannot be resolved directly (e.g. both
+    '1' and 1 are keys of a dictionary) the result of select() is used.
+
+    lookup(obj, glob) -> [value, ...]
+    """
+    pattern = glob if isinstance(glob, Pattern) else Pattern(glob)
+
+    if not pattern.literal:
+        raise InvalidGlob(f"lookup() requires a glob without wildcards: {pattern.segments}")
+
+    current = obj
+    for i, segment in enumerate(pattern.prefix):
+        if leaf(current):
+            return []
+
+        found = _direct(current, segment)
+
+        if found is None:
+            return [value for _, value in select(obj, pattern)]
+
+        if not found:
+            return []
+
+        [(key, current)] = found
+
+        # The location is only built for the error, so the lookup stays
+        # O(depth).
+        if _invalid_key(key):
+            _check_key(key, tuple(pattern.segments[:i]))
+
+    return [current]
+
+
+def _select(obj, pattern: Pattern, location=(), snapshot=False, pause: Optional[int] = None, start=None):
+    """
+    Same as select(), but yields (Location, parent, value) triples where
+    parent is the object that holds the value.
+
+    Sending a true value into the generator in place of next() skips the
+    children of the value that was just yielded, e.g. because the caller has
+    removed or replaced it. Callers that mutate parents while selecting must
+    set snapshot, so the children of each object are collected before any of
+    them are yielded.
+
+    If pause is set, None is also yielded after every pause keys that are
+    visited, whether or not they match, so the caller can interrupt long
+    selections.
+
+    start is the pattern state (see Pattern.step) that the children of obj
+    are matched from, when obj is itself somewhere inside a document.
+    """
+    state = pattern.start if start is None else start
+
+    if state is None or leaf(obj):
+        return
+
+    stack = [iter(((location, obj, state),))]
+    countdown = pause or 0
+
+    def passing(location, state, pairs, size):
+        # The children of a node when none of them can match, so they are
+        # only descended into. They are stepped through one at a time as the
+        # traversal reaches them, rather than all up front, so callers that
+        # stop early don't pay for the rest of a large container.
+        nonlocal countdown
+
+        for k, v in pairs:
+            if countdown:
+                countdown -= 1
+                if not countdown:
+                    countdown = pause
+                    yield None
+
+            _check_key(k, location)
+
+            following, _ = pattern.step(state, k, size)
+            if following is not None and not leaf(v):
+                yield Location(location, k), v, following
+
+    while stack:
+        for entry in stack[-1]:
+            if entry is None:
+                yield None
+                continue
+
+            location, node, state = entry
+            descend = []
+            size = _size(node)
+
+            pairs = candidates(node, pattern.lookup(state))
+            if snapshot:
+                pairs = tuple(pairs)
+
+            if not pattern.may_match(state):
+                stack.append(passing(location, state, pairs, size))
+                break
+
+            for k, v in pairs:
+                if countdown:
+                    countdown -= 1
+                    if not countdown:
+                        countdown = pause
+                        yield None
+
+                _check_key(k, location)
+
+                following, matched = pattern.step(state, k, size)
+                if following is not None and leaf(v):
+                    following = None
+
+                if matched or following is not None:
+                    path = Location(location, k)
+
+                    if matched and (yield path, node, v):
+                        continue
+
+                    if following is not None:
+                        descend.append((path, v, following))
+
+            if descend:
+                stack.append(iter(descend))
+            break
+        else:
+            stack.pop()
+
+
+def _select_many(obj, patterns: Sequence[Pattern], location=()):
+    """
+    Same as _select(), but matches all of the patterns in a single traversal
+    of obj. Yields (index, Location, parent, value) tuples, where index is the
+    position in patterns of a pattern that matched; a value that matches
+    several patterns is yielded once for each of them.
+
+    The results for each pattern come out in the same order as _select()
+    would produce them for that pattern alone.
+    """
+    states = tuple((i, pattern.start) for i, pattern in enumerate(patterns) if pattern.start is not None)
+
+    if not states or leaf(obj):
+        return
+
+    stack = [iter(((location, obj, states),))]
+
+    while stack:
+        for location, node, states in stack[-1]:
+            descend = []
+            size = _size(node)
+
+            for k, v, live in _candidates_many(node, patterns, states):
+                _check_key(k, location)
+
+                following = []
+                matched = []
+
+                for i, state in live:
+                    state, hit = patterns[i].step(state, k, size)
+
+                    if hit:
+                        matched.append(i)
+                    if state is not None:
+                        following.append((i, state))
+
+                if following and leaf(v):
+                    following = None
+
+                if matched or following:
+                    path = Location(location, k)
+
+                    for i in matched:
+                        yield i, path, node, v
+
+                    if following:
+                        descend.append((path, v, tuple(following)))
+
+            if descend:
+                stack.append(iter(descend))
+            break
+        else:
+            stack.pop()
+
+
+def _candidates_many(node, patterns: Sequence[Pattern], states):
+    """
+    Return the (key, value, states) triples of node that might advance any
+    of the (index, state) pairs in states, along with the pairs that each
+    key might advance.
+
+    If every state is waiting for a literal segment, only the keys those
+    segments name are looked up, and each key is only paired with the
+    states that named it. Otherwise every key is paired with every state.
+    """
+    owners = {}
+
+    for i, state in states:
+        segment = patterns[i].lookup(state)
+
+        if segment is None or not segment.literal:
+            break
+
+        found = _direct(node, segment)
+
+        if found is None:
+            break
+
+        for key, value in found:
+            owners.setdefault(key, (key, value, []))[2].append((i, state))
+    else:
+        return owners.values()
+
+    return ((key, value, states) for key, value in _walkable(node))
+
+
 def extend(thing: MutableSequence, index: int, value=None):
     """
     Extend a sequence like thing such that it contains at least index +
@@ -411,19 +856,200 @@ def foldm(obj, f, acc):
     return acc
 
 
-def view(obj: MutableMapping, glob: Glob):
+def view(obj: MutableMapping, glob: Glob, copy=True):
     """
     Return a view of the object where the glob matches. A view retains
     the same form as the obj, but is limited to only the paths that
     matched. Views are new objects (a deepcopy of the matching values).
 
+    If copy is False, the view is a read-only proxy instead (see
+    MappingView), which looks up the matching paths in obj as they are
+    accessed and copies nothing.
+
     view(obj, glob) -> obj'
     """
+    if not copy:
+        pattern = glob if isinstance(glob, Pattern) else Pattern(glob)
+        state = pattern.start
+
+        if state is None or leaf(obj):
+            return type(obj)()
+
+        return _viewed(obj, pattern, state)
+
+    result = type(obj)()
+
+    for segments, value in select(obj, glob):
+        if not has(result, segments):
+            set(result, segments, deepcopy(value), hints=types(obj, segments))
+
+    return result
+
+
+# The state of a view proxy over a value that matched, so everything below it
+# is part of the view.
+_EVERYTHING = object()
+
+
+def _viewed(value, pattern: Pattern, state):
+    """
+    Return the view proxy over value, or value itself if it is a leaf.
+    """
+    if leaf(value):
+        return value
+
+    if hasattr(value, "items"):
+        return MappingView(value, pattern, state)
+
+    if isinstance(value, Sequence):
+        return SequenceView(value, pattern, state)
+
+    return value
+
+
+class _View(object):
+    """
+    The part of MappingView and SequenceView that finds which children of
+    the viewed object are in the view.
+    """
+
+    __slots__ = ("_node", "_pattern", "_state", "_children")
+
+    def __init__(self, node, pattern: Pattern, state):
+        self._node = node
+        self._pattern = pattern
+        self._state = state
+        self._children = None
+
+    def _included(self) -> dict:
+        """
+        Return the keys of the children that are in the view, mapped to the
+        states their own views start from. This is worked out on first use.
+
+        A child is in the view if it matched, or if anything below it does.
+        """
+        children = self._children
+
+        if children is None:
+            node = self._node
+            pattern = self._pattern
+            state = self._state
+            children = {}
+
+            if state is _EVERYTHING:
+                for k, _ in _walkable(node):
+                    children[k] = _EVERYTHING
+            else:
+                size = _size(node)
+
+                for k, v in candidates(node, pattern.lookup(state)):
+                    following, matched = pattern.step(state, k, size)
+
+                    if matched:
+                        children[k] = _EVERYTHING
+                    elif following is not None and not leaf(v):
+                        for _ in _select(v, pattern, start=following):
+                            children[k] = following
+                            break
+
+            self._children = children
+
+        return children
+
+    def _child(self, key):
+        node = self._node
+        pattern = self._pattern
+        state = self._state
+
+        if state is _EVERYTHING:
+            return _viewed(node[key], pattern, state)
+
+        if self._children is not None:
+            return _viewed(node[key], pattern, self._children[key])
+
+        # Only this child has to be checked to look it up.
+        try:
+            value = node[key]
+        except IndexError:
+            raise KeyError(key)
+
+        following, matched = pattern.step(state, key, _size(node))
+
+        if matched:
+            return _viewed(value, pattern, _EVERYTHING)
+
+        if following is not None and not leaf(value):
+            for _ in _select(value, pattern, start=following):
+                return _viewed(value, pattern, following)
+
+        raise KeyError(key)
+
+
+class MappingView(_View, Mapping):
+    """
+    A read-only view of a mapping, returned by view(obj, glob, copy=False),
+    that only has the keys on the way to values that matched the glob.
+
+    Nothing is copied: values are looked up in the original object when they
+    are accessed, and containers below it are returned as views too. The
+    keys of each container are worked out when they are first needed, so
+    the original object should not be changed while a view of it is in use.
+    """
+
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        return self._child(key)
+
+    def __iter__(self):
+        return iter(self._included())
+
+    def __len__(self):
+        return len(self._included())
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({dict(self)!r})"
+
+
+class SequenceView(_View, Sequence):
+    """
+    A read-only view of a sequence, like MappingView. Elements that are not
+    in the view are None, and the view ends with the last element that is,
+    just as in the views that view() copies.
+    """
+
+    __slots__ = ()
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        length = len(self)
+
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("view index out of range")
+
+        if self._state is not _EVERYTHING and index not in self._included():
+            return None
+
+        return self._child(index)
+
+    def __len__(self):
+        if self._state is _EVERYTHING:
+            return len(self._node)
+
+        children = self._included()
+        return max(children) + 1 if children else 0
+
+    def __eq__(self, other):
+        if isinstance(other, Sequence) and not leaf(other):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+        return NotImplemented
 
-    def f(obj, pair, result):
-        (segments, value) = pair
-        if match(segments, glob):
-            if not has(result, segments):
-                set(result, segments, deepcopy(value), hints=types(obj, segments))
+    __hash__ = None
 
-    return fold(obj, f, type(obj)())
+    def __repr__(self):
+        return f"{self.__class__.__name__}({list(self)!r})"
@@ -0,0 +1,329 @@
+"""
+Search JSON documents as they are read from a file, without loading them.
+
+Only the parts of the document that a glob can match are decoded: every other
+value is skipped over as it is read, so memory use depends on the size of the
+matches rather than the size of the document.
+"""
+# Needed for pre-3.10 versions
+from __future__ import annotations
+
+import codecs
+import json
+import re
+from typing import Iterator, Tuple, Any
+
+from dpath import _engine, segments
+from dpath.pattern import compile
+from dpath.types import Filter, Glob
+
+__all__ = ["search"]
+
+# The amount of the file read at a time. Reads grow with the value being
+# scanned, so a long value is not rescanned once per chunk.
+_CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+# Everything up to the next bracket, including whole strings. Brackets inside
+# strings don't count when skipping a container.
+_STRUCTURE = re.compile(r'(?:[^"\[\]{}]+|"[^"\\]*(?:\\.[^"\\]*)*")*', re.DOTALL)
+
+# The rest of a string after its opening quote, including the closing quote.
+_STRING_BODY = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+
+_SCALAR = re.compile(r'-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][-+]?\d+)?|true|false|null|NaN|-?Infinity')
+
+# Everything that can be part of a scalar. The fraction and exponent of a
+# number are optional, so a number cut off by the end of the buffer (say
+# after its '.') still matches _SCALAR; it is only known to be complete once
+# something that cannot be part of it follows.
+_SCALAR_TOKEN = re.compile(r'[-+.\w]*')
+
+# The characters that can continue a number that matched _SCALAR.
+_NUMBER_CONTINUED = frozenset("0123456789.eE+-")
+
+
+class _Reader(object):
+    """
+    A buffer over a text or binary file object, for scanning JSON.
+
+    Positions are offsets into buf. The data before pos has been consumed and
+    is dropped from the buffer when more data is read.
+    """
+
+    def __init__(self, fp):
+        self.fp = fp
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = None
+
+    def fill(self) -> int:
+        """
+        Read more data into the buffer, dropping everything before pos.
+
+        Returns how far the data in the buffer moved, which has to be
+        subtracted from any positions held by the caller. Raises
+        JSONDecodeError if the file has no more data.
+        """
+        if self.eof:
+            raise json.JSONDecodeError("Unexpected end of document", self.buf, len(self.buf))
+
+        shift = self.pos
+        remaining = self.buf[shift:]
+
+        while True:
+            data = self.fp.read(max(_CHUNK_SIZE, len(remaining)))
+
+            if not data:
+                self.eof = True
+
+            if isinstance(data, bytes):
+                if self.decoder is None:
+                    self.decoder = codecs.getincrementaldecoder("utf-8")()
+
+                # Nothing is decoded from a read that ends part way through a
+                # character, unless it is the last.
+                data = self.decoder.decode(data, final=self.eof)
+
+            if data or self.eof:
+                break
+
+        self.buf = remaining + data
+        self.pos = 0
+
+        return shift
+
+    def peek(self) -> str:
+        """
+        Skip whitespace and return the next character, without consuming it.
+        Returns an empty string at the end of the file.
+        """
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+
+            if self.pos < len(self.buf) or self.eof:
+                return self.buf[self.pos:self.pos + 1]
+
+            self.fill()
+
+    def expect(self, char: str):
+        """
+        Consume char, which must be the next character after any whitespace.
+        """
+        if self.peek() != char:
+            raise json.JSONDecodeError(f"Expecting {char!r}", self.buf, self.pos)
+
+        self.pos += 1
+
+    def string(self) -> str:
+        """
+        Consume and decode the string at pos.
+        """
+        end = self.scan(keep=True)
+        value, _ = json.decoder.scanstring(self.buf, self.pos + 1)
+
+        self.pos = end
+        return value
+
+    def value(self) -> Any:
+        """
+        Consume and decode the value at pos.
+        """
+        end = self.scan(keep=True)
+        value = json.loads(self.buf[self.pos:end])
+
+        self.pos = end
+        return value
+
+    def skip(self):
+        """
+        Consume the value at pos without decoding it.
+        """
+        self.pos = self.scan(keep=False)
+
+    def scan(self, keep: bool) -> int:
+        """
+        Find the end of the value at pos, reading as much of the file as that
+        takes, and return it.
+
+        If keep is True the whole value is kept in the buffer, starting at
+        pos. Otherwise the parts that have been scanned may be dropped, and
+        pos is left wherever that happened to stop.
+        """
+        i = self.pos
+        char = self.buf[i]
+
+        if char == '"':
+            return self._scan_string(i + 1, keep)
+
+        if char not in "[{":
+            return self._scan_scalar(i)
+
+        depth = 1
+        i += 1
+
+        while depth:
+            i = _STRUCTURE.match(self.buf, i).end()
+            char = self.buf[i:i + 1]
+
+            if char in ("[", "{"):
+                depth += 1
+            elif char in ("]", "}"):
+                depth -= 1
+            else:
+                # The end of the buffer, or a string that runs past it.
+                if not keep:
+                    self.pos = i
+                i -= self.fill()
+                continue
+
+            i += 1
+
+        return i
+
+    def _scan_string(self, i: int, keep: bool) -> int:
+        # i is just past the opening quote of the string.
+        while True:
+            match = _STRING_BODY.match(self.buf, i)
+
+            if match is not None:
+                return match.end()
+
+            if not keep:
+                self.pos = i - 1
+            i -= self.fill()
+
+    def _scan_scalar(self, i: int) -> int:
+        while True:
+            match = _SCALAR.match(self.buf, i)
+
+            if match is not None:
+                end = match.end()
+                if end < len(self.buf) and self.buf[end] not in _NUMBER_CONTINUED:
+                    return end
+
+            if self.eof or _SCALAR_TOKEN.match(self.buf, i).end() < len(self.buf):
+                if match is None:
+                    raise json.JSONDecodeError("Expecting value", self.buf, i)
+
+                return match.end()
+
+            i -= self.fill()
+
+
+def search(
+        fp,
+        glob: Glob,
+        separator="/",
+        afilter: Filter | None = None,
+        dirs=True
+) -> Iterator[Tuple[str, Any]]:
+    """
+    Search the JSON document read from fp, yielding (path, value) tuples for
+    every element that matched the glob, like dpath.search(..., yielded=True).
+
+    fp is a text or binary (UTF-8) file object. It is read incrementally, and
+    only values that match are decoded: other parts of the document are
+    skipped over as they are read, and are not validated. A value that
+    matches is decoded in full, and any matches inside it are then found in
+    memory.
+
+    Results are yielded in the order they appear in the document, with each
+    value before the values inside it. The length of an array is only known
+    once it has been read, so negative indices in the glob never match.
+    """
+    pattern = compile(glob, separator)
+    keeper = _engine.make_keeper(afilter, dirs)
+
+    def result(path, found):
+        return separator.join(map(segments.int_str, path)), found
+
+    def descend(path, value, state):
+        # Matches below a value that has been decoded, in document order.
+        stack = [(path, state, segments._walkable(value))]
+
+        while stack:
+            path, state, pairs = stack[-1]
+
+            for key, found in pairs:
+                segments._check_key(key, path)
+
+                following, matched = pattern.step(state, key)
+                if following is not None and segments.leaf(found):
+                    following = None
+
+                if matched and keeper(found):
+                    yield result(path + (key,), found)
+
+                if following is not None:
+                    stack.append((path + (key,), following, segments._walkable(found)))
+                    break
+            else:
+                stack.pop()
+
+    reader = _Reader(fp)
+    state = pattern.start
+    char = reader.peek()
+
+    if char not in ("[", "{") or state is None:
+        return
+
+    reader.pos += 1
+
+    # Each open container: its closing character, its path, its state and the
+    # number of values read from it so far.
+    stack = [["]" if char == "[" else "}", (), state, 0]]
+
+    while stack:
+        frame = stack[-1]
+        closing, path, state, count = frame
+
+        char = reader.peek()
+
+        if char == closing:
+            reader.pos += 1
+            stack.pop()
+            continue
+
+        if count:
+            reader.expect(",")
+            char = reader.peek()
+
+        frame[3] += 1
+
+        if closing == "}":
+            if char != '"':
+                raise json.JSONDecodeError("Expecting property name enclosed in double quotes", reader.buf, reader.pos)
+
+            key = reader.string()
+            reader.expect(":")
+            char = reader.peek()
+        else:
+            key = count
+
+        if not char:
+            raise json.JSONDecodeError("Expecting value", reader.buf, reader.pos)
+
+        segments._check_key(key, path)
+
+        following, matched = pattern.step(state, key)
+        if char not in "[{":
+            following = None
+
+        if matched:
+            found = reader.value()
+
+            if keeper(found):
+                yield result(path + (key,), found)
+
+            if following is not None:
+                yield from descend(path + (key,), found, following)
+
+        elif following is not None:
+            reader.pos += 1
+            stack.append(["]" if char == "[" else "}", path + (key,), following, 0])
+
+        else:
+            reader.skip()
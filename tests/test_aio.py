@@ -0,0 +1,78 @@
+import asyncio
+from copy import deepcopy
+
+import dpath
+from dpath import aio
+
+
+def test_aio_search():
+    doc = {
+        "users": [
+            {"name": f"user{i}", "email": f"user{i}@example.com", "groups": {"g0": i, "g1": [i, i + 1]}}
+            for i in range(300)
+        ],
+        "meta": {"count": 300},
+    }
+
+    async def run():
+        searched = await aio.search(doc, "users/*/groups/*", every=7)
+        found = [match async for match in aio.search(doc, "**/g1/*", yielded=True, every=7)]
+        filtered = await aio.values(doc, "users/*/*", afilter=lambda x: isinstance(x, str), every=1)
+        leaves = await aio.search(doc, "meta/**", dirs=False)
+        return searched, found, filtered, leaves
+
+    searched, found, filtered, leaves = asyncio.run(run())
+
+    assert searched == dpath.search(doc, "users/*/groups/*")
+    assert found == list(dpath.search(doc, "**/g1/*", yielded=True))
+    assert filtered == dpath.values(doc, "users/*/*", afilter=lambda x: isinstance(x, str))
+    assert leaves == {"meta": {"count": 300}}
+
+
+def test_aio_merge():
+    doc = {"users": [{"name": f"user{i}", "groups": {"g0": i}} for i in range(300)], "meta": {"count": 300}}
+    overlays = [{"users": [{"name": f"overlay{j}"}], "meta": {"count": j, "extra": [j]}} for j in range(3)]
+
+    expected = deepcopy(doc)
+    dpath.merge_many(expected, deepcopy(overlays))
+
+    merged = deepcopy(doc)
+    assert asyncio.run(aio.merge_many(merged, deepcopy(overlays), every=5)) is merged
+    assert merged == expected
+
+    def afilter(x):
+        return isinstance(x, int)
+
+    expected = deepcopy(doc)
+    dpath.merge(expected, {"meta": {"count": 0, "skip": "x"}}, afilter=afilter)
+
+    merged = deepcopy(doc)
+    asyncio.run(aio.merge(merged, {"meta": {"count": 0, "skip": "x"}}, afilter=afilter, every=1))
+    assert merged == expected
+    assert merged["meta"] == {"count": 0}
+
+
+def test_aio_interleaving():
+    doc = {"users": [{"name": f"user{i}", "groups": {"g0": i, "g1": [i, i + 1]}} for i in range(300)]}
+    ticks = []
+
+    async def ticker(done):
+        while not done.is_set():
+            ticks.append(len(ticks))
+            await asyncio.sleep(0)
+
+    async def run():
+        done = asyncio.Event()
+        task = asyncio.ensure_future(ticker(done))
+
+        try:
+            await asyncio.sleep(0)
+            before = len(ticks)
+            await aio.values(doc, "**", every=100)
+            return len(ticks) - before
+        finally:
+            done.set()
+            await task
+
+    # Other tasks run while the document is searched, once per pause.
+    assert asyncio.run(run()) > 10
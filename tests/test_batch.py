@@ -0,0 +1,89 @@
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
+
+import dpath
+from dpath import batch
+
+
+def test_batch_threads():
+    docs = [{"user": {"id": i, "tags": ["a", "b"][:i % 3]}, "secret": i} for i in range(20)]
+    operations = [
+        batch.get("user/id"),
+        batch.values("user/tags/*"),
+        batch.set("user/id", 0),
+        batch.delete("secret"),
+        batch.search("user/*", yielded=True),
+    ]
+
+    results = batch.run(operations, docs, workers=2, chunk_size=3)
+
+    assert len(results) == len(docs)
+    for i, (document, returned, error) in enumerate(results):
+        tags = ["a", "b"][:i % 3]
+
+        # Threads work on the documents themselves.
+        assert document is docs[i]
+        assert document == {"user": {"id": 0, "tags": tags}}
+        assert returned == [i, tags, 1, 1, [("user/id", 0), ("user/tags", tags)]]
+        assert error is None
+
+
+def test_batch_processes():
+    docs = [{"user": {"id": i, "tags": ["a", "b"][:i % 3]}, "secret": i} for i in range(20)]
+    original = deepcopy(docs)
+    operations = [batch.get("user/id"), batch.set("user/id", 0), batch.delete("secret")]
+
+    results = batch.run(operations, docs, processes=True, workers=2, chunk_size=7)
+
+    assert [result.results[0] for result in results] == list(range(20))
+    assert [result.document for result in results] == [{"user": {"id": 0, "tags": doc["user"]["tags"]}} for doc in docs]
+
+    # Processes work on copies.
+    assert docs == original
+
+
+def test_batch_bounded():
+    read = []
+    ahead = []
+
+    def documents():
+        for i in range(100):
+            read.append(i)
+            yield {"a": i}
+
+    def afilter(x):
+        # How many documents had been read when this one was processed.
+        ahead.append(len(read) - x)
+        return True
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        results = batch.run([batch.values("a", afilter=afilter)], documents(), executor=executor, workers=1, chunk_size=1)
+
+    assert [result.results for result in results] == [[[i]] for i in range(100)]
+
+    # With one worker, no more than two chunks wait at a time.
+    assert max(ahead) <= 3
+
+
+def test_batch_errors():
+    docs = [{"a": 1}, {}, {"a": 2}]
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        results = batch.run([batch.get("a"), batch.set("a", 0)], docs, executor=executor, chunk_size=2)
+
+    assert [result.results for result in results] == [[1, 1], [], [2, 1]]
+    assert [type(result.error) for result in results] == [type(None), KeyError, type(None)]
+    assert docs == [{"a": 0}, {}, {"a": 0}]
+
+
+def test_batch_operation():
+    operation = batch.get("a;b", separator=";", default=None)
+
+    assert operation.pattern == dpath.compile(["a", "b"])
+    assert operation({"a": {"b": 1}}) == 1
+    assert operation({}) is None
+
+    copied = pickle.loads(pickle.dumps(operation))
+    assert copied.pattern == operation.pattern
+    assert copied({"a": {"b": 2}}) == 2
@@ -0,0 +1,48 @@
+import json
+import os
+import tempfile
+
+import dpath
+from dpath import bench
+
+
+def test_bench_save_compare():
+    fd, filename = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+
+    try:
+        # Every operation has to run on every shape, even tiny ones.
+        bench.main(["--sizes", "10", "--repeat", "1", "--save", filename])
+
+        with open(filename) as fp:
+            saved = json.load(fp)
+
+        assert saved["dpath"] == bench.VERSION
+        assert len(saved["results"]) == len(bench.SHAPES) * len(bench.OPERATIONS)
+        for result in saved["results"]:
+            assert result["size"] == 10
+            assert result["best"] > 0
+            assert result["peak"] >= 0
+
+        loaded = bench.load(filename)
+        assert ("deep", 10, "merge") in loaded
+
+        bench.main(["--sizes", "10", "--shapes", "wide", "--operations", "get,merge", "--no-memory", "--compare", filename])
+    finally:
+        os.unlink(filename)
+
+
+def test_bench_shapes():
+    for name, generate in bench.SHAPES.items():
+        shape = generate(1000)
+
+        # The globs are only meaningful if they match something.
+        dpath.get(shape.document, shape.leaf)
+        assert dpath.values(shape.document, shape.glob), name
+        assert isinstance(dpath.get(shape.document, shape.parent), dict), name
+
+
+def test_bench_scenarios():
+    bench.main(["walk", "--nodes", "100", "--repeat", "1"])
+    bench.main(["merge_many", "--sources", "2", "--repeat", "1"])
+    bench.main(["ndjson", "--records", "10", "--repeat", "1"])
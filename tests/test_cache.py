@@ -0,0 +1,125 @@
+import asyncio
+import gc
+
+from nose2.tools.such import helper
+
+import dpath
+from dpath import aio, cache
+
+
+def test_cached_queries():
+    cached = dpath.Cached({"db": {"host": "localhost", "port": 5432}, "users": [{"name": "a"}, {"name": "b"}]})
+
+    def is_b(x):
+        return x == "b"
+
+    for _ in range(3):
+        assert cached.get("db/host") == "localhost"
+        assert cached.values("users/*/name") == ["a", "b"]
+        assert cached.search("db/port") == {"db": {"port": 5432}}
+        assert list(cached.search("users/*/name", yielded=True)) == [("users/0/name", "a"), ("users/1/name", "b")]
+        assert cached.first("users/*/name") == "a"
+        assert cached.exists("users/*/name", afilter=is_b)
+        assert cached.count("users/*") == 2
+
+    assert cached.info() == cache.CacheInfo(hits=14, misses=7, invalidations=0, maxsize=128, currsize=7)
+
+    # The same glob with a different separator is the same query.
+    assert cached.get("db.host", separator=".") == "localhost"
+    assert cached.hits == 15
+
+    assert cached.get("db/user", default=None) is None
+    with helper.assertRaises(KeyError):
+        cached.get("db/user")
+    with helper.assertRaises(KeyError):
+        cached.first("users/*/email")
+
+    # Paths that aren't found are cached too.
+    hits = cached.hits
+    with helper.assertRaises(KeyError):
+        cached.first("users/*/email")
+    assert cached.first("users/*/email", default=None) is None
+    assert cached.hits == hits + 2
+
+
+def test_cached_invalidation():
+    doc = {"db": {"host": "localhost", "port": 5432}}
+    cached = dpath.Cached(doc)
+    other = dpath.Cached({"db": {"host": "localhost", "port": 5432}})
+
+    assert cached.get("db/host") == "localhost"
+    assert other.get("db/host") == "localhost"
+
+    dpath.set(doc, "db/host", "db.example.com")
+    assert cached.get("db/host") == "db.example.com"
+
+    cached.new("db/user", "admin")
+    assert cached.values("db/*") == ["db.example.com", 5432, "admin"]
+
+    cached.delete("db/user")
+    dpath.merge(doc, {"db": {"port": 5433}})
+    assert cached.values("db/*") == ["db.example.com", 5433]
+
+    asyncio.run(aio.merge(doc, {"db": {"port": 5434}}))
+    assert cached.get("db/port") == 5434
+
+    doc["db"]["port"] = 5435
+    assert cached.get("db/port") == 5434
+    cached.invalidate()
+    assert cached.get("db/port") == 5435
+
+    assert cached.invalidations == 6
+    assert other.info().invalidations == 0
+    assert other.hits == 0
+
+
+def test_cached_eviction():
+    doc = {"db": {"host": "localhost", "port": 5432}, "users": [{"name": str(i)} for i in range(300)]}
+
+    cached = dpath.Cached(doc, maxsize=2)
+
+    cached.get("db/host")
+    cached.get("db/port")
+    cached.get("db/host")
+    cached.get("users/0/name")
+
+    # db/port was the least recently used.
+    assert cached.info().currsize == 2
+    cached.get("db/host")
+    cached.get("db/port")
+    assert (cached.hits, cached.misses) == (2, 4)
+
+    unlimited = dpath.Cached(doc, maxsize=None)
+    for i in range(300):
+        unlimited.values(["users", str(i)])
+    assert unlimited.info().currsize == 300
+
+    disabled = dpath.Cached(doc, maxsize=0)
+    disabled.get("db/host")
+    disabled.get("db/host")
+    assert disabled.info() == cache.CacheInfo(hits=0, misses=2, invalidations=0, maxsize=0, currsize=0)
+
+
+def test_cached_registry():
+    doc = {"db": {"host": "localhost"}}
+    cached = dpath.Cached(doc)
+    registered = len(cache._caches)
+
+    others = [dpath.Cached({"n": i}) for i in range(100)]
+    assert len(cache._caches) == registered + 100
+
+    # Changing a document without a cache doesn't touch any of them.
+    dpath.new({}, "a", 1)
+    dpath.merge({}, {"a": 1})
+    assert cached.invalidations == 0
+    assert all(other.invalidations == 0 for other in others)
+
+    dpath.set(doc, "db/host", "db.example.com")
+    assert cached.invalidations == 1
+    assert all(other.invalidations == 0 for other in others)
+
+    # Caches leave the registry when they are collected.
+    del others
+    gc.collect()
+    assert len(cache._caches) == registered
+    assert len(cache._caches[id(doc)]) == 1
@@ -0,0 +1,92 @@
+import math
+from array import array
+from unittest import SkipTest
+
+from nose2.tools.such import helper
+
+import dpath
+
+
+def test_columns():
+    records = [
+        {"metrics": {"latency": 0.25, "count": 1}},
+        {"metrics": {"latency": 0.5, "count": 2}},
+        {"metrics": {"latency": None, "count": 3}},
+        {"metrics": {"count": 4}},
+    ]
+
+    result = dpath.columns(records, {"latency": "*/metrics/latency", "count": "*/metrics/c*"})
+
+    assert list(result) == ["latency", "count"]
+    assert result["count"] == array("d", [1, 2, 3, 4])
+    assert result["latency"][:2] == array("d", [0.25, 0.5])
+    assert math.isnan(result["latency"][2]) and math.isnan(result["latency"][3])
+
+    # Nulls are missing values, like records without a match.
+    result, masks = dpath.columns(records, {"latency": "*/metrics/latency"}, mask=True)
+    assert result["latency"] == array("d", [0.25, 0.5, 0, 0])
+    assert masks["latency"] == bytearray([0, 0, 1, 1])
+
+    # Negative indices count back from the end of a list of records.
+    assert dpath.columns(records, {"count": "-1/metrics/count"}, dtype="q", fill=0)["count"] == array("q", [0, 0, 0, 4])
+
+
+def test_columns_dict():
+    # The rows of a dictionary are in its order, and other kinds of records
+    # go through the same key rules as search().
+    records = {"x": {"v": [7, 8]}, "y": {"v": {"1": 9}}, "z": {"v": 1}}
+
+    result, masks = dpath.columns(records, {"v": "*/v/1"}, dtype="q", mask=True)
+    assert result["v"] == array("q", [8, 9, 0])
+    assert masks["v"] == bytearray([0, 0, 1])
+
+    assert dpath.columns(records, {"none": "*/missing"}, dtype="l", fill=-1)["none"] == array("l", [-1, -1, -1])
+
+    # Dictionary keys are not indices, whatever they are.
+    records = {0: {"l": 1.0}, 1: {"l": 2.0}}
+    for glob in ("-1/l", "-1/*"):
+        assert all(map(math.isnan, dpath.columns(records, {"l": glob})["l"]))
+
+
+def test_columns_invalid():
+    records = [
+        {"metrics": {"latency": 0.25, "count": 1}, "tags": ["a"]},
+        {"metrics": {"count": 2}, "tags": []},
+    ]
+
+    with helper.assertRaises(ValueError):
+        dpath.columns(records, {"none": "*/missing"}, dtype="q")
+
+    with helper.assertRaises(ValueError):
+        dpath.columns(records, {"any": "*/metrics/*"})
+
+    with helper.assertRaises(TypeError):
+        dpath.columns(records, {"tags": "*/tags/0"})
+
+
+def test_columns_overflow():
+    records = [{"a": 1}, {"a": 2 ** 70}]
+
+    with helper.assertRaises(OverflowError):
+        dpath.columns(records, {"a": "*/a"}, dtype="q")
+
+    try:
+        dpath.columns(records, {"a": "*/[a]"}, dtype="q")
+    except OverflowError as e:
+        assert "found at 1/a" in str(e)
+    else:
+        raise AssertionError("OverflowError not raised")
+
+
+def test_columns_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise SkipTest("numpy is not installed")
+
+    records = [{"latency": 0.25}, {"latency": 0.5}, {}]
+    result, masks = dpath.columns(records, {"latency": "*/latency"}, mask=True, as_numpy=True)
+
+    assert isinstance(result["latency"], numpy.ndarray)
+    assert result["latency"].tolist() == [0.25, 0.5, 0.0]
+    assert masks["latency"].tolist() == [False, False, True]
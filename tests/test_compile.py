@@ -0,0 +1,60 @@
+import pickle
+
+from nose2.tools.such import helper
+
+import dpath
+from dpath.exceptions import InvalidGlob
+
+
+def test_compile_returns_pattern():
+    pattern = dpath.compile('/a/*/c')
+
+    assert isinstance(pattern, dpath.Pattern)
+    assert tuple(pattern) == ('a', '*', 'c')
+    assert dpath.compile(pattern) is pattern
+    assert dpath.compile('/a/*/c') is pattern
+
+
+def test_compile_separator():
+    pattern = dpath.compile(';a;b', separator=';')
+    assert tuple(pattern) == ('a', 'b')
+
+    pattern = dpath.compile(['a', 'b/c'], separator=';')
+    assert tuple(pattern) == ('a', 'b/c')
+
+
+def test_compile_invalid_glob():
+    helper.assertRaises(InvalidGlob, dpath.compile, 'a/**/b/**')
+
+
+def test_compile_pickle():
+    pattern = dpath.compile('a/**/[bc]')
+    assert pickle.loads(pickle.dumps(pattern)) == pattern
+
+
+def test_compiled_glob_everywhere():
+    doc = {
+        "a": {
+            "b": [0, 1, 2],
+            "c": {"d": 3},
+        },
+    }
+
+    pattern = dpath.compile('a/b/*')
+    assert dpath.values(doc, pattern) == [0, 1, 2]
+    assert dpath.search(doc, pattern) == {'a': {'b': [0, 1, 2]}}
+    assert [p for p, v in dpath.search(doc, pattern, yielded=True)] == ['a/b/0', 'a/b/1', 'a/b/2']
+
+    assert dpath.get(doc, dpath.compile('a/c/d')) == 3
+    assert dpath.get(doc, dpath.compile('/')) is doc
+
+    assert dpath.set(doc, dpath.compile('a/c/*'), 4) == 1
+    assert doc['a']['c']['d'] == 4
+
+    assert dpath.delete(doc, dpath.compile('a/c')) == 1
+    assert 'c' not in doc['a']
+
+
+def test_compiled_negative_index():
+    doc = {'a': [1, 2, 3]}
+    assert dpath.get(doc, dpath.compile('a/-1')) == 3
@@ -54,3 +54,95 @@ def test_delete_filter():
     assert dict['a']['b'] == 0
     assert dict['a']['c'] == 1
     assert 'd' not in dict['a']
+
+
+def test_delete_negative_index():
+    dict = {
+        "a": [0, 1, 2],
+    }
+
+    dpath.delete(dict, '/a/-1')
+    assert dict['a'] == [0, 1]
+
+    dpath.delete(dict, '/a/-2')
+    assert dict['a'] == [None, 1]
+
+
+def test_delete_nested_matches():
+    dict = {
+        "a": {
+            "b": {
+                "c": 0,
+            },
+            "d": [
+                {"e": 1},
+                {"e": 2},
+            ],
+        },
+        "f": 3,
+    }
+
+    # Everything below a deleted value goes with it, so it is only counted once.
+    assert dpath.delete(dict, '/a/*/**') == 2
+    assert dict == {"a": {}, "f": 3}
+
+
+def test_delete_list_elements():
+    dict = {
+        "a": [0, 1, 2],
+    }
+
+    assert dpath.delete(dict, '/a/*') == 3
+    assert dict['a'] == [None, None]
+
+
+def test_delete_filter_outside_glob():
+    def afilter(x):
+        return x == 31
+
+    dict = {
+        "a": {"b": 31, "c": 1},
+        "d": 31,
+        "e": {"f": {"g": 31}},
+        "h": [31, 31],
+    }
+
+    # The afilter selects leaves anywhere in the object, not only where the
+    # glob matches.
+    assert dpath.delete(dict, '/a/*', afilter=afilter) == 5
+    assert dict == {
+        "a": {"c": 1},
+        "e": {"f": {}},
+        "h": [None],
+    }
+
+    with helper.assertRaises(dpath.exceptions.PathNotFound):
+        dpath.delete(dict, '/a/*', afilter=afilter)
+
+
+def test_delete_compact():
+    dict = {
+        "a": [0, 1, 2, 3, 4],
+    }
+
+    assert dpath.delete(dict, '/a/[013]', compact=True) == 3
+    assert dict['a'] == [2, 4]
+
+
+def test_delete_compact_nested():
+    dict = {
+        "a": [
+            {"b": [0, 1, 2]},
+            {"b": [3, 4, 5]},
+            {"b": [6, 7, 8]},
+        ],
+    }
+
+    assert dpath.delete(dict, '/a/*/b/[01]', compact=True) == 6
+    assert dict['a'] == [{"b": [2]}, {"b": [5]}, {"b": [8]}]
+
+    # Matches below a deleted element are not counted or compacted separately.
+    assert dpath.delete(dict, '/a/**', compact=True, afilter=lambda x: x in (2, 5)) == 2
+    assert dict['a'] == [{"b": []}, {"b": []}, {"b": [8]}]
+    assert dpath.delete(dict, '/a/[02]/**', compact=True) == 2
+    assert dict['a'] == [{"b": []}]
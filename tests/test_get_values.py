@@ -2,8 +2,6 @@ import datetime
 import decimal
 import time
 
-from unittest import mock
-
 from nose2.tools.such import helper
 
 import dpath
@@ -42,6 +40,50 @@ def test_get_explicit_single():
     assert dpath.get(ehash, ['doesnt', 'exist'], default=5) == 5
 
 
+def test_get_explicit_list_index():
+    ehash = {
+        "a": [
+            {"b": 0},
+            {"b": 1},
+            {"b": 2},
+        ],
+    }
+
+    assert dpath.get(ehash, '/a/1/b') == 1
+    assert dpath.get(ehash, ['a', 2, 'b']) == 2
+    assert dpath.get(ehash, '/a/-1/b') == 2
+    assert dpath.get(ehash, '/a/3/b', default=None) is None
+    helper.assertRaises(KeyError, dpath.get, ehash, '/a/b')
+
+
+def test_get_explicit_ambiguous_int_key():
+    ehash = {
+        "a": {
+            "1": "str",
+            1: "int",
+        },
+        "b": {
+            1: "int",
+        },
+    }
+
+    helper.assertRaises(ValueError, dpath.get, ehash, '/a/1')
+    assert dpath.get(ehash, '/b/1') == "int"
+
+
+def test_get_bool_and_float_keys():
+    ehash = {
+        "a": {True: "bool"},
+        "b": {2.0: "float"},
+    }
+
+    assert dpath.get(ehash, '/a/1') == "bool"
+    assert dpath.get(ehash, '/a/True') == "bool"
+
+    # Float keys never match a glob.
+    helper.assertRaises(KeyError, dpath.get, ehash, '/b/2')
+
+
 def test_get_glob_single():
     ehash = {
         "a": {
@@ -113,18 +155,18 @@ def test_values():
     assert 2 in ret
 
 
-@mock.patch('dpath.search')
-def test_values_passes_through(searchfunc):
-    searchfunc.return_value = []
+def test_values_same_as_search():
+    ehash = {"a": {"b": [{"c": 1}, {"c": 2}, {"d": 3}], "e": {"c": 4}}}
 
-    def y():
-        return False
+    def y(x):
+        return x != 2
 
-    dpath.values({}, '/a/b', ':', y, False)
-    searchfunc.assert_called_with({}, '/a/b', True, ':', y, False)
+    for args in [('a/**/c',), ('a:**:c', ':', y, False), (['a', '*', '*'], '/', None, True, 2)]:
+        expected = [v for p, v in dpath.search(ehash, args[0], True, *args[1:4])]
+        if len(args) > 4:
+            expected = expected[:args[4]]
 
-    dpath.values({}, ['a', 'b'], ':', y, False)
-    searchfunc.assert_called_with({}, ['a', 'b'], True, ':', y, False)
+        assert dpath.values(ehash, *args) == expected
 
 
 def test_none_values():
@@ -0,0 +1,100 @@
+from threading import Thread
+
+from nose2.tools.such import helper
+
+import dpath
+from dpath import instrument
+from dpath.exceptions import PathNotFound
+
+
+def test_instrument_record():
+    doc = {"a": {"b": {"c": 1, "d": 2}, "e": [3, 4]}, "f": 5}
+
+    with instrument.record() as records:
+        dpath.search(doc, "a/b/c")
+        dpath.values(doc, "a/*/*", afilter=lambda x: x > 1)
+        dpath.new({}, "x/y/z", 1)
+
+        with helper.assertRaises(PathNotFound):
+            dpath.delete(doc, "missing")
+
+    assert [r.operation for r in records] == ["search", "values", "new", "delete"]
+    search, values, new, delete = records
+
+    assert search.as_dict() == {
+        "operation": "search",
+        "glob": "a/b/c",
+        "visited": 3,
+        "matches": 3,
+        "filtered": 0,
+        "created": 2,
+        "elapsed": search.elapsed,
+    }
+    assert search.elapsed > 0
+
+    # values() counts the keys it visits and the afilter calls it makes.
+    assert values.glob == "a/*/*"
+    assert values.filtered == 4
+    assert values.visited > 0
+
+    assert new.created == 2
+    assert delete.glob == "missing"
+
+    # Nothing is recorded outside of the block.
+    assert not instrument.enabled
+    dpath.get(doc, "f")
+    assert len(records) == 4
+
+
+def test_instrument_yielded():
+    doc = {"a": {"b": {"c": 1, "d": 2}, "e": [3, 4]}, "f": 5}
+    received = []
+
+    with instrument.record(received.append) as records:
+        found = dpath.search(doc, "**", yielded=True)
+        next(found)
+        assert records == []
+
+        assert len(list(found)) == 7
+
+    assert records == received
+    assert records[0].operation == "search"
+    assert records[0].visited == 8
+
+
+def test_instrument_hooks_threads():
+    doc = {"a": {"b": {"c": 1, "d": 2}, "e": [3, 4]}, "f": 5}
+    hooked = []
+    instrument.add_hook(hooked.append)
+
+    try:
+        def other():
+            dpath.get(doc, "f")
+
+        with instrument.record() as records:
+            thread = Thread(target=other)
+            thread.start()
+            thread.join()
+            dpath.merge(doc, {"a": {"b": {"g": 6}}})
+    finally:
+        instrument.remove_hook(hooked.append)
+
+    # record() only sees its own thread, hooks see every thread.
+    assert [r.operation for r in records] == ["merge"]
+    assert sorted(r.operation for r in hooked) == ["get", "merge"]
+    assert records[0].visited == 3
+
+    assert not instrument.enabled
+
+
+def test_instrument_get():
+    doc = {"a": {"b": {"c": 1}}, "f": 5}
+
+    with instrument.record() as records:
+        dpath.get(doc, "a/b/c")
+        dpath.get(doc, "a/*/c")
+
+    # Literal globs are looked up directly, but count the same work.
+    literal, wildcard = records
+    assert (literal.glob, literal.visited, literal.matches) == ("a/b/c", 3, 3)
+    assert (wildcard.visited, wildcard.matches) == (3, 3)
@@ -0,0 +1,88 @@
+import copy
+
+from nose2.tools.such import helper
+
+import dpath
+from dpath import MergeType
+
+
+def test_layered_get():
+    defaults = {"db": {"host": "localhost", "port": 5432, "options": ["ssl"]}, "debug": False, "workers": 4}
+    environment = {"db": {"host": "db.example.com", "options": ["pool"]}, "workers": 8}
+    tenant = {"debug": {"level": 2}}
+
+    view = dpath.Layered(defaults, environment, tenant)
+
+    assert dpath.get(view, "db/host") == "db.example.com"
+    assert dpath.get(view, "db/port") == 5432
+    assert dpath.get(view, "db/options") == ["ssl", "pool"]
+    assert dpath.get(view, "debug/level") == 2
+    assert dpath.get(view, "workers") == 8
+
+    with helper.assertRaises(KeyError):
+        dpath.get(view, "db/user")
+
+
+def test_layered_keys():
+    view = dpath.Layered(
+        {"db": {"host": "localhost", "port": 5432}, "debug": False},
+        {"db": {"host": "db.example.com", "options": ["pool"]}, "workers": 8},
+        {"db": {"name": "tenant"}},
+    )
+
+    assert list(view) == ["db", "debug", "workers"]
+    assert list(view["db"]) == ["host", "port", "options", "name"]
+    assert len(view["db"]) == 4
+    assert "name" in view["db"]
+    assert "user" not in view["db"]
+
+
+def test_layered_search():
+    view = dpath.Layered(
+        {"db": {"host": "localhost", "port": 5432, "options": ["ssl"]}, "debug": False},
+        {"db": {"host": "db.example.com", "options": ["pool"]}},
+        {"db": {"name": "tenant"}, "debug": {"level": 2}},
+    )
+
+    assert dpath.search(view, "db/*o*") == {"db": {"host": "db.example.com", "port": 5432, "options": ["ssl", "pool"]}}
+    assert dpath.values(view, "**/level") == [2]
+
+
+def test_layered_materialize():
+    sources = [
+        {"db": {"host": "localhost", "port": 5432, "options": ["ssl"]}, "debug": False, "workers": 4},
+        {"db": {"host": "db.example.com", "options": ["pool"]}, "workers": 8},
+        {"db": {"name": "tenant"}, "debug": {"level": 2}},
+    ]
+    original = copy.deepcopy(sources)
+
+    for flags in (MergeType.ADDITIVE, MergeType.REPLACE):
+        view = dpath.Layered(*sources, flags=flags)
+        materialized = view.materialize()
+
+        assert materialized == dpath.merge_many({}, copy.deepcopy(sources), flags=flags)
+        assert materialized == view
+        assert type(materialized["db"]) is dict
+
+    # Neither resolving nor materializing modifies the layers.
+    assert sources == original
+
+
+def test_layered_replace():
+    view = dpath.Layered({"db": {"options": ["ssl"]}}, {"db": {"options": ["pool"]}}, flags=MergeType.REPLACE)
+
+    assert view["db"]["options"] == ["pool"]
+
+
+def test_layered_typesafe():
+    view = dpath.Layered(
+        {"db": {"host": "localhost"}, "debug": False},
+        {"db": {"host": "db.example.com"}},
+        {"debug": {"level": 2}},
+        flags=MergeType.ADDITIVE | MergeType.TYPESAFE,
+    )
+
+    assert view["db"]["host"] == "db.example.com"
+
+    with helper.assertRaises(TypeError):
+        view["debug"]
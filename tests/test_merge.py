@@ -195,3 +195,49 @@ def test_merge_list():
         dpath.merge(dst2, d)
     assert dst1["l"] == [1, 2]
     assert dst2["l"] == [1, 2]
+
+
+def test_merge_nested_containers():
+    dst = {"a": {"b": {"c": 0, "d": [0]}}, "e": 1}
+    src = {"a": {"b": {"c": 1, "d": [1], "f": 2}}}
+    b = dst["a"]["b"]
+
+    dpath.merge(dst, src)
+
+    # The existing containers in dst are merged into, not replaced.
+    assert dst["a"]["b"] is b
+    assert dst == {"a": {"b": {"c": 1, "d": [0, 1], "f": 2}}, "e": 1}
+
+
+def test_merge_many():
+    sources = [
+        {"a": {"b": 0, "l": [0]}, "c": 0},
+        {"a": {"b": 1, "d": {"e": 1}}, "f": [1]},
+        {"a": {"d": {"e": 2, "g": 2}, "l": [2]}, "c": {"h": 2}},
+        {"f": [3], "a": {"b": 3}},
+    ]
+
+    for flags in (MergeType.ADDITIVE, MergeType.REPLACE):
+        expected = {}
+        for src in copy.deepcopy(sources):
+            dpath.merge(expected, src, flags=flags)
+
+        dst = dpath.merge_many({}, copy.deepcopy(sources), flags=flags)
+        assert dst == expected
+        assert list(dst) == list(expected) == ["a", "c", "f"]
+
+
+def test_merge_many_immutable_sequences():
+    dst = {"t": (0,)}
+
+    # Adding to a tuple doesn't change the tuple in the destination, so each
+    # source is added to the original.
+    dpath.merge_many(dst, [{"t": (1,)}, {"t": (2,)}])
+    assert dst == {"t": (0,)}
+
+
+def test_merge_many_filter():
+    sources = [{"a": {"b": 0, "c": "x"}}, {"a": {"b": "y", "d": 1}}]
+
+    dst = dpath.merge_many({}, sources, afilter=lambda x: isinstance(x, int))
+    assert dst == {"a": {"b": 0, "d": 1}}
@@ -0,0 +1,68 @@
+import json
+import os
+import tempfile
+
+from dpath import ndjson
+
+
+def is_even(value):
+    return value % 2 == 0
+
+
+def write_records(count):
+    fd, filename = tempfile.mkstemp(suffix=".ndjson")
+
+    offsets = []
+    offset = 0
+    with os.fdopen(fd, "w") as fp:
+        for i in range(count):
+            line = json.dumps({"id": i, "user": {"tags": ["a", "b", "c"][:i % 4]}}) + "\n"
+            offsets.append(offset)
+
+            # Blank lines are skipped.
+            if i % 10 == 0:
+                line += "\n"
+
+            fp.write(line)
+            offset += len(line)
+
+    return filename, offsets
+
+
+def test_ndjson_values():
+    filename, offsets = write_records(500)
+    try:
+        expected = [(offset, ["a", "b", "c"][:i % 4]) for i, offset in enumerate(offsets)]
+
+        assert list(ndjson.values(filename, "user/tags/*", workers=2, chunk_size=256)) == expected
+        assert sorted(ndjson.values(filename, "user/tags/*", workers=2, chunk_size=256, ordered=False)) == expected
+    finally:
+        os.unlink(filename)
+
+
+def test_ndjson_values_filter():
+    filename, offsets = write_records(100)
+    try:
+        found = [values for _, values in ndjson.values(filename, ["id"], afilter=is_even, workers=2, chunk_size=100)]
+        assert found == [[i] if i % 2 == 0 else [] for i in range(100)]
+    finally:
+        os.unlink(filename)
+
+
+def test_ndjson_values_empty():
+    fd, filename = tempfile.mkstemp(suffix=".ndjson")
+    os.close(fd)
+    try:
+        assert list(ndjson.values(filename, "**", workers=1)) == []
+    finally:
+        os.unlink(filename)
+
+
+def test_ndjson_values_no_trailing_newline():
+    fd, filename = tempfile.mkstemp(suffix=".ndjson")
+    with os.fdopen(fd, "w") as fp:
+        fp.write('{"a": 1}\n{"a": 2}')
+    try:
+        assert list(ndjson.values(filename, "a", workers=1, chunk_size=1)) == [(0, [1]), (9, [2])]
+    finally:
+        os.unlink(filename)
@@ -36,3 +36,21 @@ def test_path_paths_empty_key_allowed():
 
     dpath.options.ALLOW_EMPTY_STRING_KEYS = False
     assert "/".join(segments) == "Empty//Key"
+
+
+def test_path_paths_deep():
+    depth = 10000
+
+    tdict = {}
+    current = tdict
+    for _ in range(depth):
+        current["a"] = {}
+        current = current["a"]
+    current["a"] = "bottom"
+
+    assert sum(1 for _ in dpath.segments.walk(tdict)) == depth + 1
+    assert dpath.segments.lookup(tdict, ("a",) * (depth + 1)) == ["bottom"]
+
+    found = [v for _, v in dpath.segments.select(tdict, ("**",))]
+    assert len(found) == depth + 1
+    assert found[-1] == "bottom"
@@ -0,0 +1,108 @@
+from copy import deepcopy
+
+from nose2.tools.such import helper
+
+from dpath import MergeType, persistent
+from dpath.exceptions import PathNotFound
+
+
+def test_persistent_set():
+    v1 = {
+        "db": {"host": "localhost", "port": 5432, "replicas": [{"host": "r0"}, {"host": "r1"}]},
+        "users": [{"name": "a"}, {"name": "b"}],
+        "flags": {"debug": False},
+    }
+    original = deepcopy(v1)
+
+    v2 = persistent.set(v1, "db/replicas/*/host", "r")
+
+    assert v1 == original
+    assert v2["db"]["replicas"] == [{"host": "r"}, {"host": "r"}]
+
+    # Only the containers on the way to a change are copied.
+    assert v2 is not v1 and v2["db"] is not v1["db"]
+    assert v2["users"] is v1["users"]
+    assert v2["flags"] is v1["flags"]
+
+    v3 = persistent.set(v2, "db/port", 5433, afilter=lambda x: x > 1000)
+    assert v3["db"]["replicas"] is v2["db"]["replicas"]
+    assert (v1["db"]["port"], v2["db"]["port"], v3["db"]["port"]) == (5432, 5432, 5433)
+
+    # Nothing matched, so nothing changed.
+    assert persistent.set(v3, "missing/*", 0) is v3
+
+
+def test_persistent_new_delete():
+    v1 = {
+        "db": {"host": "localhost", "replicas": [{"host": "r0"}, {"host": "r1"}]},
+        "users": [{"name": "a"}, {"name": "b"}],
+    }
+    original = deepcopy(v1)
+
+    v2 = persistent.new(v1, "db/options/timeout", 30)
+    v3 = persistent.delete(v2, "users/0")
+    v4 = persistent.delete(v3, "db/replicas/0", compact=True)
+
+    assert v1 == original
+    assert v2["db"]["options"] == {"timeout": 30}
+    assert v2["users"] is v1["users"]
+    assert v3["users"] == [None, {"name": "b"}]
+    assert v2["users"] == [{"name": "a"}, {"name": "b"}]
+    assert v4["db"]["replicas"] == [{"host": "r1"}]
+    assert v4["db"]["replicas"][0] is v1["db"]["replicas"][1]
+    assert v3["db"]["replicas"] == original["db"]["replicas"]
+
+    with helper.assertRaises(PathNotFound):
+        persistent.delete(v1, "missing")
+
+
+def test_persistent_tuples():
+    v1 = {"a": ({"b": 1, "c": 2}, ({"d": 3},)), "e": ({"f": 4},)}
+    original = deepcopy(v1)
+
+    v2 = persistent.set(v1, "a/0/b", 10)
+    v3 = persistent.delete(v2, "a/1/0/d")
+
+    assert v1 == original
+    assert v2 == {"a": ({"b": 10, "c": 2}, ({"d": 3},)), "e": ({"f": 4},)}
+    assert v3 == {"a": ({"b": 10, "c": 2}, ({},)), "e": ({"f": 4},)}
+    assert v3["a"][0] is v2["a"][0]
+    assert v3["e"] is v1["e"]
+
+
+def test_persistent_merge():
+    v1 = {
+        "db": {"host": "localhost", "port": 5432, "replicas": [{"host": "r0"}, {"host": "r1"}]},
+        "users": [{"name": "a"}, {"name": "b"}],
+        "flags": {"debug": False},
+    }
+    original = deepcopy(v1)
+    overlay = {"db": {"host": "db.example.com", "replicas": [{"host": "r2"}]}, "flags": {"debug": True}}
+    snapshot = deepcopy(overlay)
+
+    v2 = persistent.merge(v1, overlay)
+    assert v1 == original
+    assert overlay == snapshot
+    assert v2["db"]["host"] == "db.example.com"
+    assert v2["db"]["replicas"] == [{"host": "r0"}, {"host": "r1"}, {"host": "r2"}]
+    assert v2["users"] is v1["users"]
+
+    # The replicas are only appended to, so the ones already there are shared.
+    assert v2["db"]["replicas"][0] is v1["db"]["replicas"][0]
+
+    # Merging the same overlay twice must not change the earlier version,
+    # even though the first merge put containers from it into v2.
+    v3 = persistent.merge_many(v2, [overlay, {"flags": {"trace": True}}])
+    assert len(v2["db"]["replicas"]) == 3
+    assert len(v3["db"]["replicas"]) == 4
+    assert v3["flags"] == {"debug": True, "trace": True}
+    assert v2["flags"] == {"debug": True}
+    assert overlay == snapshot
+
+    v4 = persistent.merge(v1, {"db": {"port": 1, "host": "h"}}, afilter=lambda x: isinstance(x, str))
+    assert v4["db"]["host"] == "h" and v4["db"]["port"] == 5432
+
+    v5 = persistent.merge(v1, overlay, flags=MergeType.REPLACE)
+    assert v5["db"]["replicas"] == [{"host": "r2"}]
+    assert v5["users"] is v1["users"]
+    assert v1 == original
@@ -1,6 +1,25 @@
+from collections.abc import Mapping
+
+from nose2.tools.such import helper
+
 import dpath
 
 
+class Untouchable(Mapping):
+    """
+    A mapping that fails the test if a search looks inside it.
+    """
+
+    def __getitem__(self, key):
+        raise AssertionError("Untouchable was visited")
+
+    def __iter__(self):
+        raise AssertionError("Untouchable was visited")
+
+    def __len__(self):
+        raise AssertionError("Untouchable was visited")
+
+
 def test_search_paths_with_separator():
     dict = {
         "a": {
@@ -243,3 +262,148 @@ def test_search_negative_index():
     res = dpath.search(d, 'a/b/-1')
 
     assert res == dpath.search(d, "a/b/2")
+
+
+def test_search_negative_index_star_star():
+    d = {'a': {'b': [1, 2, 3], 'c': [{'d': [4, 5]}]}}
+
+    assert dpath.values(d, 'a/**/-1') == [3, {'d': [4, 5]}, 5]
+    assert [p for p, _ in dpath.search(d, '**/-2', yielded=True)] == ['a/b/1', 'a/c/0/d/0']
+
+
+def test_search_bool_and_float_keys():
+    d = {'x': {True: 'bool', 2.0: 'float'}}
+
+    # Literal globs find the same keys, under the same paths, as wildcards.
+    assert list(dpath.search(d, 'x/1', yielded=True)) == [('x/True', 'bool')]
+    assert list(dpath.search(d, 'x/True', yielded=True)) == [('x/True', 'bool')]
+    assert list(dpath.search(d, 'x/*', yielded=True)) == [('x/True', 'bool')]
+    assert dpath.search(d, 'x/1') == {'x': {True: 'bool'}}
+
+    # Float keys never match a glob.
+    assert dpath.search(d, 'x/2') == {}
+
+
+def test_search_skips_unrelated_branches():
+    d = {
+        'config': {
+            'db': {
+                'main': {'host': 'a', 'port': 1},
+                'replica': {'host': 'b', 'port': 2},
+            },
+            'cache': Untouchable(),
+        },
+        'data': Untouchable(),
+    }
+
+    assert dpath.values(d, 'config/db/*/host') == ['a', 'b']
+    assert dpath.get(d, 'config/db/main/port') == 1
+    assert dpath.search(d, 'config/db/**/port') == {
+        'config': {'db': {'main': {'port': 1}, 'replica': {'port': 2}}},
+    }
+
+
+def test_search_result_placeholders():
+    d = {'a': [{'b': [0, 1]}, [2]]}
+
+    # a/1 is found first, which pads the result list with a placeholder for
+    # a/0; the container for a/0/b then takes its place.
+    assert dpath.search(d, '**/1') == {'a': [{'b': [None, 1]}, [2]]}
+
+
+def test_search_result_deep():
+    d = node = {}
+    for i in range(2000):
+        node['status'] = i
+        node['next'] = node = {}
+
+    result = dpath.search(d, '**/status')
+
+    for i in range(1999):
+        assert list(result) == ['status', 'next']
+        assert result['status'] == i
+        result = result['next']
+
+    assert result == {'status': 1999}
+
+
+def test_search_many():
+    d = {
+        'servers': [
+            {'host': 'a', 'port': 1, 'tags': {'role': 'db'}},
+            {'host': 'b', 'port': 2, 'tags': {'role': 'web'}},
+        ],
+        'role': 'primary',
+    }
+    globs = {
+        'hosts': 'servers/*/host',
+        'first': 'servers/0',
+        'last_port': 'servers/-1/port',
+        'roles': '**/role',
+        'missing': 'servers/*/user',
+    }
+
+    results = dpath.search_many(d, globs)
+
+    assert list(results) == list(globs)
+    for name, glob in globs.items():
+        assert results[name] == dpath.search(d, glob)
+
+    found = {name: [] for name in globs}
+    for name, path, value in dpath.search_many(d, globs, yielded=True):
+        found[name].append((path, value))
+
+    for name, glob in globs.items():
+        assert found[name] == list(dpath.search(d, glob, yielded=True))
+
+
+def test_search_many_nested_matches():
+    d = {'a': {'b': {'c': 1}}}
+
+    # The first glob matches a/b, so a/b/c is already part of its result.
+    results = dpath.search_many(d, {'ab': 'a/*', 'all': '**'})
+
+    assert results == {'ab': {'a': {'b': {'c': 1}}}, 'all': {'a': {'b': {'c': 1}}}}
+    assert results['all']['a'] is d['a']
+
+
+def test_search_limit():
+    d = {'a': [{'b': 0}, {'b': 1}, {'b': 2}], 'c': {'b': 3}}
+
+    assert dpath.values(d, '**/b', limit=2) == [0, 1]
+    assert list(dpath.search(d, '**/b', yielded=True, limit=1)) == [('a/0/b', 0)]
+    assert dpath.search(d, '**/b', limit=2) == {'a': [{'b': 0}, {'b': 1}]}
+    assert dpath.search(d, '**/b', limit=0) == {}
+    assert dpath.values(d, '**/b', limit=10) == [0, 1, 2, 3]
+
+
+def test_search_negative_limit():
+    d = {'a': [{'b': 0}, {'b': 1}]}
+
+    with helper.assertRaises(ValueError):
+        dpath.search(d, 'a/*', limit=-1)
+    with helper.assertRaises(ValueError):
+        dpath.search(d, 'a/*', yielded=True, limit=-1)
+    with helper.assertRaises(ValueError):
+        dpath.values(d, 'a/*', limit=-1)
+    with helper.assertRaises(ValueError):
+        dpath.count(d, 'a/*', limit=-1)
+
+
+def test_first_exists_count():
+    d = {'items': [{'id': 1, 'ok': False}, {'id': 2, 'ok': True}, Untouchable()]}
+
+    assert dpath.first(d, 'items/*/id') == 1
+    assert dpath.first(d, 'items/*/ok', afilter=lambda x: x is True) is True
+    assert dpath.first(d, 'items/0/missing', default=None) is None
+    with helper.assertRaises(KeyError):
+        dpath.first(d, 'items/0/missing')
+
+    assert dpath.exists(d, 'items/*/ok', afilter=lambda x: x is True)
+    assert dpath.exists(d, 'items/1/ok')
+    assert not dpath.exists({'a': {'b': 1}}, '*/c')
+    assert not dpath.exists({'a': {'b': 1}}, 'a', dirs=False)
+
+    assert dpath.count(d, 'items/*/id', limit=2) == 2
+    assert dpath.count({'a': [{'b': 0}, {'b': 1}]}, '**/b') == 2
+    assert dpath.count({'a': [{'b': 0}, {'b': 1}]}, '**') == 5
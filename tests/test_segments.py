@@ -6,6 +6,8 @@ from hypothesis import given, assume, settings, HealthCheck
 
 import dpath.segments as api
 from dpath import options
+from dpath.pattern import Pattern
+from dpath.types import ListIndex
 
 settings.register_profile("default", suppress_health_check=(HealthCheck.too_slow,))
 settings.load_profile(os.getenv(u'HYPOTHESIS_PROFILE', 'default'))
@@ -153,6 +155,20 @@ def random_leaves(draw):
     return (node, draw(st.sampled_from(found)))
 
 
+@st.composite
+def random_walk_with_glob(draw):
+    (node, (segments, found)) = draw(random_walk())
+    glob = list(map(lambda x: draw(mutate(x)), segments))
+
+    # 50/50 chance we will replace a range of the glob with a star-star.
+    if draw(st.sampled_from((True, False))):
+        start = draw(st.integers(0, len(glob)))
+        stop = draw(st.integers(start, len(glob)))
+        glob[start:stop] = ['**']
+
+    return node, glob
+
+
 class TestSegments(TestCase):
     @classmethod
     def setUpClass(cls):
@@ -173,6 +189,31 @@ class TestSegments(TestCase):
         for k, v in api.make_walkable(node):
             assert node[k] is v
 
+    @given(random_node)
+    def test_kvs_indices(self, node):
+        '''
+        Given a sequence node, kvs should produce ListIndex indices, and the
+        internal variant plain integer ones.
+        '''
+        if not isinstance(node, dict):
+            for i, (k, v) in enumerate(api.make_walkable(node)):
+                assert isinstance(k, ListIndex)
+                assert k == i and k == i - len(node)
+
+            for i, (k, v) in enumerate(api._walkable(node)):
+                assert type(k) is int
+                assert k == i
+
+    def test_walk_negative_index(self):
+        '''
+        Paths from walk and leaves should match globs with negative indices.
+        '''
+        obj = {'a': [1, 2, 3], 'b': {'c': [4]}}
+
+        assert [p for p, _ in api.walk(obj) if api.match(p, ['a', '-1'])] == [('a', 2)]
+        assert [v for p, v in api.leaves(obj) if api.match(p, ['*', '*', '-1'])] == [4]
+        assert [v for p, v in api.leaves(obj) if api.match(p, ['a', '-3'])] == [1]
+
     @given(random_leaf)
     def test_leaf_with_leaf(self, leaf):
         '''
@@ -219,6 +260,23 @@ class TestSegments(TestCase):
             if api.leaf(v):
                 assert api.has(node, k + (0,)) is False
 
+    @given(random_segments)
+    def test_location(self, segments):
+        '''
+        Given segments, a chain of locations should materialize to the same
+        segments.
+        '''
+        assume(len(segments) > 0)
+
+        location = ()
+        for segment in segments:
+            location = api.Location(location, segment)
+
+        assert location.segments() == tuple(segments)
+
+        if len(segments) > 1:
+            assert location.parent.segments() == tuple(segments[:-1])
+
     @given(random_segments)
     def test_expand(self, segments):
         '''
@@ -270,6 +328,49 @@ class TestSegments(TestCase):
         (segments, glob) = pair
         assert api.match(segments, glob) is False
 
+    @given(random_segments_with_glob())
+    def test_match_compiled(self, pair):
+        '''
+        Given segments and a known good glob, the compiled glob should match.
+        '''
+        (segments, glob) = pair
+        assert api.match(segments, Pattern(glob)) is True
+
+    @given(random_segments_with_nonmatching_glob())
+    def test_match_compiled_nonmatching(self, pair):
+        '''
+        Given segments and a known bad glob, the compiled glob should not match.
+        '''
+        (segments, glob) = pair
+        assert api.match(segments, Pattern(glob)) is False
+
+    @given(random_walk_with_glob())
+    def test_select(self, walkable):
+        '''
+        Given a node and a glob, select should yield exactly the walked pairs
+        that match the glob, in walk order.
+        '''
+        (node, glob) = walkable
+        expected = [(k, v) for k, v in api.walk(node) if api.match(k, glob)]
+        selected = list(api.select(node, glob))
+
+        assert len(selected) == len(expected)
+        for (sk, sv), (ek, ev) in zip(selected, expected):
+            assert sk == ek
+            assert sv is ev
+
+    @given(random_node)
+    def test_lookup(self, node):
+        '''
+        Given a node, lookup should find the value of every walked path that
+        is also a literal glob.
+        '''
+        for k, v in api.walk(node):
+            glob = Pattern(tuple(map(api.int_str, k)))
+
+            if glob.literal:
+                assert any(found is v for found in api.lookup(node, glob))
+
     @given(walkable=random_walk(), value=random_thing)
     def test_set_walkable(self, walkable, value):
         '''
@@ -329,3 +430,39 @@ class TestSegments(TestCase):
 
         view = api.view(node, segments)
         assert api.get(view, segments) == api.get(node, segments)
+
+    def test_view_lazy(self):
+        '''
+        A view that isn't copied has the same contents as one that is, and
+        shares the values below it with the original object.
+        '''
+        node = {
+            'a': [{'b': 1, 'c': {'d': [2]}}, {'c': 3}, {'b': 4}],
+            'e': {'b': 5},
+            'f': {'g': 6},
+        }
+
+        for glob in (['a', '*', 'b'], ['**', 'b'], ['a', '2'], ['a', '-2', 'c'], ['*', 'c'], ['f'], ['x']):
+            view = api.view(node, glob, copy=False)
+            assert view == api.view(node, glob), glob
+
+        view = api.view(node, ['**', 'c'], copy=False)
+        assert isinstance(view, api.MappingView)
+        assert list(view) == ['a']
+        assert view['a'] == [{'c': {'d': [2]}}, {'c': 3}]
+        assert view['a'][-1] == {'c': 3}
+        assert view['a'][:1] == [{'c': {'d': [2]}}]
+
+        # Matched containers are viewed whole, without copying.
+        matched = view['a'][0]['c']
+        assert isinstance(matched, api.MappingView)
+        assert matched['d'] == [2]
+        assert matched['d']._node is node['a'][0]['c']['d']
+
+        assert 'e' not in view
+        with self.assertRaises(KeyError):
+            view['e']
+        with self.assertRaises(TypeError):
+            view['a'] = None
+        with self.assertRaises(IndexError):
+            view['a'][2]
@@ -46,6 +46,18 @@ def test_set_existing_list():
     assert dict['a'][0] == 1
 
 
+def test_set_negative_index():
+    dict = {
+        "a": [0, 1, 2],
+    }
+
+    assert dpath.set(dict, '/a/-1', 3) == 1
+    assert dict['a'] == [0, 1, 3]
+
+    assert dpath.set(dict, ['a', -3], 4) == 1
+    assert dict['a'] == [4, 1, 3]
+
+
 def test_set_filter():
     def afilter(x):
         if int(x) == 31:
@@ -89,3 +101,20 @@ def test_set_existing_path_with_separator():
     dpath.set(dict, ['a', 'b/c/d'], 1)
     assert len(dict['a']) == 1
     assert dict['a']['b/c/d'] == 1
+
+
+def test_set_replaced_subtree():
+    dict = {
+        "a": {
+            "b": {
+                "a": 0,
+            },
+        },
+    }
+
+    # The new value is not searched for further matches, even though it has
+    # the same shape as the value it replaced.
+    value = {"a": {"a": 1}}
+    assert dpath.set(dict, '**/a', value) == 1
+    assert dict == {"a": value}
+    assert value == {"a": {"a": 1}}
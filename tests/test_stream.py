@@ -0,0 +1,105 @@
+import io
+import json
+
+from nose2.tools.such import helper
+
+import dpath
+from dpath import stream
+
+DOCUMENT = {
+    "meta": {"count": 3, "tags": ["a", "b"]},
+    "items": [
+        {"id": 0, "name": "zero", "status": "ok"},
+        {"id": 1, "name": "one \"quoted\" [not] {a} container", "status": "failed"},
+        {"id": 2, "name": "té✓", "status": "ok", "nested": {"status": None}},
+    ],
+    "status": {"code": 1.5e3, "flags": [True, False, None]},
+}
+
+
+class Trickle(io.RawIOBase):
+    """
+    A file object that returns at most a few bytes per read, so every token
+    is split across reads somewhere.
+    """
+
+    def __init__(self, data, size):
+        self.data = data
+        self.size = size
+        self.offset = 0
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        data = self.data[self.offset:self.offset + self.size]
+        self.offset += len(data)
+        return data
+
+
+def files():
+    text = json.dumps(DOCUMENT, indent=2, ensure_ascii=False)
+
+    yield io.StringIO(text)
+    yield io.BytesIO(text.encode())
+    for size in (1, 2, 3, 7):
+        yield Trickle(text.encode(), size)
+
+
+def test_stream_search():
+    for glob in ("items/*/status", "**/status", "**", "meta/tags/1", "items/[02]/n*", "status/flags/*", "missing"):
+        expected = sorted(dpath.search(DOCUMENT, glob, yielded=True))
+
+        for fp in files():
+            assert sorted(stream.search(fp, glob)) == expected, glob
+
+
+def test_stream_search_document_order():
+    for fp in files():
+        assert [path for path, _ in stream.search(fp, "**/status")] == [
+            "items/0/status",
+            "items/1/status",
+            "items/2/status",
+            "items/2/nested/status",
+            "status",
+        ]
+
+
+def test_stream_search_filter():
+    for fp in files():
+        found = list(stream.search(fp, "items/*/*", afilter=lambda x: x == "ok"))
+        assert found == [("items/0/status", "ok"), ("items/2/status", "ok")]
+
+    for fp in files():
+        found = list(stream.search(fp, "status/**", dirs=False))
+        assert found == [
+            ("status/code", 1500.0),
+            ("status/flags/0", True),
+            ("status/flags/1", False),
+            ("status/flags/2", None),
+        ]
+
+
+def test_stream_search_negative_index():
+    for fp in files():
+        assert list(stream.search(fp, "items/-1/id")) == []
+
+
+def test_stream_search_invalid():
+    for text in ('{"a": [1, 2}', '{"a": 1', '{"a" 1}', '{"a": tru}', '[1 2]'):
+        with helper.assertRaises(ValueError):
+            list(stream.search(io.StringIO(text), "**"))
+
+
+def test_stream_search_scalar_boundary():
+    # Long numbers cut by the end of a read right after their '.', 'e' or
+    # sign still match as shorter numbers, so they have to be read in full.
+    prefix = '{"pad": "'
+
+    for number in ("1697558400.125", "-30000000000.0", "1.2345678901234e-05"):
+        for cut in range(1, len(number)):
+            pad = stream._CHUNK_SIZE - len(prefix) - len('", "t": ') - cut
+            text = prefix + "x" * pad + '", "t": ' + number + ', "u": 1}'
+
+            assert list(stream.search(io.StringIO(text), "t")) == [("t", json.loads(number))]
+            assert list(stream.search(io.StringIO(text), "u")) == [("u", 1)]